@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from api.activities.models import Activity
+from api.activities.models import Activity, ArchivedActivity
 
 
 admin.site.register(Activity)
+admin.site.register(ArchivedActivity)
@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.core.management.base import BaseCommand
+
+from api.activities.models import Activity, ArchivedActivity
+
+
+ARCHIVED_FIELDS = ["id", "sender_id", "receiver_id", "title", "content", "message_key", "params", "type", "target_content_type_id", "target_object_id", "created_at", "updated_at"]
+
+
+class Command(BaseCommand):
+    help = "Move read activities older than the retention window from the feed table into ArchivedActivity."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=settings.ACTIVITY_RETENTION_DAYS)
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        expired = Activity.objects.filter(is_read=True, created_at__lt=cutoff).order_by("id")
+        archived = 0
+
+        while True:
+            # Each batch commits on its own so locks stay short; re-running after a crash skips rows already copied.
+            with transaction.atomic():
+                rows = list(expired.values(*ARCHIVED_FIELDS)[:batch_size])
+                if not rows:
+                    break
+                ArchivedActivity.objects.bulk_create([ArchivedActivity(**row) for row in rows], ignore_conflicts=True)
+                Activity.objects.filter(id__in=[row["id"] for row in rows]).delete()
+            archived += len(rows)
+
+        self.stdout.write(f"Archived {archived} activities older than {options['days']} days.")
@@ -0,0 +1,100 @@
+import time
+import random
+import statistics
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from api.activities.models import Activity, ArchivedActivity
+from api.activities.views import ActivityViewset
+
+
+User = get_user_model()
+
+BENCHMARK_EMAIL_DOMAIN = "feed-benchmark.invalid"
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed synthetic activities, time the feed query, run archive_activities and time it again. "
+        "Archiving covers every expired read activity, so run it against a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5_000_000)
+        parser.add_argument("--receivers", type=int, default=1000)
+        parser.add_argument("--expired-ratio", type=float, default=0.8, help="Share of rows that are read and older than the retention window.")
+        parser.add_argument("--iterations", type=int, default=200, help="Feed queries timed per phase.")
+        parser.add_argument("--per-page", type=int, default=10)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--keep", action="store_true", help="Leave the synthetic users and activities in place.")
+
+    def handle(self, *args, **options):
+        receivers = User.objects.bulk_create([User(email=f"receiver{i}@{BENCHMARK_EMAIL_DOMAIN}", fullname=f"Receiver {i}") for i in range(options["receivers"])])
+        try:
+            self.seed(receivers, options)
+            self.report("before archiving", receivers, options)
+            call_command("archive_activities", batch_size=options["batch_size"], stdout=self.stdout)
+            self.report("after archiving", receivers, options)
+        finally:
+            if not options["keep"]:
+                self.clean_up()
+
+    def seed(self, receivers, options):
+        expired_at = timezone.now() - timedelta(days=settings.ACTIVITY_RETENTION_DAYS + 30)
+        expired_every = round(1 / (1 - options["expired_ratio"])) if options["expired_ratio"] < 1 else None
+        batch_size = options["batch_size"]
+        created = 0
+
+        while created < options["rows"]:
+            count = min(batch_size, options["rows"] - created)
+            # Rows are interleaved across receivers, so every feed mixes expired rows with ones that stay.
+            rows = [Activity(receiver=receivers[(created + i) % len(receivers)], type=Activity.Types.EXPENSE_CREATE, title="Benchmark", is_read=self.is_expired(created + i, expired_every)) for i in range(count)]
+            Activity.objects.bulk_create(rows)
+            # created_at is auto_now_add, so the old rows are backdated after the insert.
+            Activity.objects.filter(id__in=[row.id for row in rows if row.is_read]).update(created_at=expired_at)
+            created += count
+
+        self.stdout.write(f"Seeded {created} activities for {len(receivers)} receivers.")
+
+    def is_expired(self, index, expired_every):
+        return expired_every is None or index % expired_every != 0
+
+    def report(self, label, receivers, options):
+        first_page, unread = [], []
+
+        for _ in range(options["iterations"]):
+            feed = self.get_feed(random.choice(receivers))
+
+            started = time.perf_counter()
+            list(feed[: options["per_page"]])
+            first_page.append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            list(feed.filter(is_read=False)[: options["per_page"]])
+            unread.append((time.perf_counter() - started) * 1000)
+
+        self.stdout.write(f"Feed table {label}: {Activity.objects.count()} rows")
+        self.stdout.write(f"  first page   {self.format_timings(first_page)}")
+        self.stdout.write(f"  unread page  {self.format_timings(unread)}")
+
+    def get_feed(self, user):
+        view = ActivityViewset(action="list")
+        view.request = SimpleNamespace(user=user, query_params={})
+        return view.get_queryset()
+
+    def format_timings(self, timings):
+        timings = sorted(timings)
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        return f"median {statistics.median(timings):.2f} ms, p95 {p95:.2f} ms"
+
+    def clean_up(self):
+        receivers = User.objects.filter(email__endswith=f"@{BENCHMARK_EMAIL_DOMAIN}")
+        Activity.objects.filter(receiver__in=receivers).delete()
+        ArchivedActivity.objects.filter(receiver__in=receivers).delete()
+        receivers.delete()
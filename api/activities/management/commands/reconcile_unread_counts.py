@@ -0,0 +1,40 @@
+from django.db.models import Count
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from api.activities.models import Activity
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Recompute User.unread_activities_count from the Activity table and fix any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last_id = 0
+        fixed = 0
+
+        while True:
+            users = list(User.objects.filter(id__gt=last_id).order_by("id").only("id", "unread_activities_count")[:batch_size])
+            if not users:
+                break
+            last_id = users[-1].id
+
+            actual = dict(Activity.objects.filter(receiver__in=users, is_read=False).values("receiver_id").annotate(count=Count("id")).values_list("receiver_id", "count"))
+            drifted = []
+            for user in users:
+                count = actual.get(user.id, 0)
+                if user.unread_activities_count != count:
+                    user.unread_activities_count = count
+                    drifted.append(user)
+
+            if drifted:
+                User.objects.bulk_update(drifted, ["unread_activities_count"])
+                fixed += len(drifted)
+
+        self.stdout.write(f"Reconciled unread counters for {fixed} users.")
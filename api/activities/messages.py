@@ -0,0 +1,34 @@
+class MessageKeys:
+    GROUP_MEMBER_ADD = "group_member_add"
+    EXPENSE_CREATE = "expense_create"
+    EXPENSE_UPDATE = "expense_update"
+
+
+MESSAGES = {
+    MessageKeys.GROUP_MEMBER_ADD: (
+        "Added in a New Group",
+        "You have been added to the new group '{group}' created by '{sender_name}': check your split now!",
+    ),
+    MessageKeys.EXPENSE_CREATE: (
+        "New Expense Added",
+        "New expense added by {sender} in the group '{group}', '{expense}'. Your share is ${amount}.",
+    ),
+    MessageKeys.EXPENSE_UPDATE: (
+        "Expense Updated",
+        "Expense updated by {sender} in the group '{group}', '{expense}'. Your share has changed to ${amount}.",
+    ),
+}
+
+
+# Params only hold ids and amounts; names are read from the activity's target when it is rendered, so old activities
+# follow renames. Targets are detached when a group or expense is deleted or the receiver leaves the group, and those
+# activities fall back to the names below (or to the names older rows stored in their params).
+DETACHED_TARGET_PARAMS = {"group": "a removed group", "expense": "a removed expense"}
+
+
+def render_title(message_key):
+    return MESSAGES[message_key][0]
+
+
+def render_content(message_key, params, sender_name, is_self):
+    return MESSAGES[message_key][1].format(sender="you" if is_self else sender_name, sender_name=sender_name, **params)
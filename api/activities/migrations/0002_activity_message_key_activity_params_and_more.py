@@ -0,0 +1,118 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:33
+
+import re
+
+from django.db import migrations, models
+
+
+CHUNK_SIZE = 1000
+
+# Templates as they stood when this migration was written; rows whose text does not round-trip keep their rendered content.
+LEGACY_MESSAGES = {
+    "group_member_add": (
+        "Added in a New Group",
+        re.compile(r"^You have been added to the new group '(?P<group>.*)' created by '(?P<sender_name>.*)': check your split now!$", re.DOTALL),
+        "You have been added to the new group '{group}' created by '{sender_name}': check your split now!",
+    ),
+    "expense_create": (
+        "New Expense Added",
+        re.compile(r"^New expense added by (?P<sender>.*) in the group '(?P<group>.*)', '(?P<expense>.*)'\. Your share is \$(?P<amount>[-0-9.]+)\.$", re.DOTALL),
+        "New expense added by {sender} in the group '{group}', '{expense}'. Your share is ${amount}.",
+    ),
+    "expense_update": (
+        "Expense Updated",
+        re.compile(r"^Expense updated by (?P<sender>.*) in the group '(?P<group>.*)', '(?P<expense>.*)'\. Your share has changed to \$(?P<amount>[-0-9.]+)\.$", re.DOTALL),
+        "Expense updated by {sender} in the group '{group}', '{expense}'. Your share has changed to ${amount}.",
+    ),
+}
+
+
+def compact_activity(activity, sender_name):
+    legacy = LEGACY_MESSAGES.get(activity.type)
+    if legacy is None or activity.title != legacy[0] or sender_name is None:
+        return False
+
+    match = legacy[1].match(activity.content)
+    if match is None:
+        return False
+
+    params = {key: value for key, value in match.groupdict().items() if key not in ("sender", "sender_name")}
+    sender = "you" if activity.sender_id == activity.receiver_id else sender_name
+    if legacy[2].format(sender=sender, sender_name=sender_name, **params) != activity.content:
+        return False
+
+    activity.message_key = activity.type
+    activity.params = params
+    activity.title = ""
+    activity.content = ""
+    return True
+
+
+def compact_activities(apps, schema_editor):
+    Activity = apps.get_model("activities", "Activity")
+    User = apps.get_model("users", "User")
+
+    last_id = 0
+    while True:
+        chunk = list(Activity.objects.filter(id__gt=last_id, message_key__isnull=True).order_by("id")[:CHUNK_SIZE])
+        if not chunk:
+            break
+        last_id = chunk[-1].id
+
+        sender_names = dict(User.objects.filter(id__in={a.sender_id for a in chunk if a.sender_id}).values_list("id", "fullname"))
+        compacted = [a for a in chunk if compact_activity(a, sender_names.get(a.sender_id))]
+        Activity.objects.bulk_update(compacted, ["message_key", "params", "title", "content"])
+
+
+def expand_activities(apps, schema_editor):
+    Activity = apps.get_model("activities", "Activity")
+    User = apps.get_model("users", "User")
+
+    last_id = 0
+    while True:
+        chunk = list(Activity.objects.filter(id__gt=last_id, message_key__isnull=False).order_by("id")[:CHUNK_SIZE])
+        if not chunk:
+            break
+        last_id = chunk[-1].id
+
+        sender_names = dict(User.objects.filter(id__in={a.sender_id for a in chunk if a.sender_id}).values_list("id", "fullname"))
+        for activity in chunk:
+            title, _, template = LEGACY_MESSAGES[activity.message_key]
+            sender_name = sender_names.get(activity.sender_id, "Someone")
+            sender = "you" if activity.sender_id == activity.receiver_id else sender_name
+            activity.title = title
+            activity.content = template.format(sender=sender, sender_name=sender_name, **activity.params)
+            activity.message_key = None
+        Activity.objects.bulk_update(chunk, ["message_key", "title", "content"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0001_initial'),
+        ('users', '0002_user_unread_activities_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activity',
+            name='message_key',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='activity',
+            name='params',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AlterField(
+            model_name='activity',
+            name='content',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='activity',
+            name='title',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.RunPython(compact_activities, expand_activities),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:36
+
+import api.activities.models
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0002_activity_message_key_activity_params_and_more'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedActivity',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(blank=True, max_length=100)),
+                ('content', models.TextField(blank=True)),
+                ('message_key', models.CharField(blank=True, max_length=50, null=True)),
+                ('params', models.JSONField(blank=True, default=dict)),
+                ('type', models.CharField(choices=[('group_member_add', 'Group Member Add'), ('expense_create', 'Expense Create'), ('expense_update', 'Expense Update')], max_length=50)),
+                ('target_object_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('receiver', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('sender', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('target_content_type', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['receiver', '-id'], name='activities__receive_57cf1b_idx')],
+            },
+            bases=(api.activities.models.RenderedMessageMixin, models.Model),
+        ),
+    ]
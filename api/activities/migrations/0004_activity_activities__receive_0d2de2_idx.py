@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+from api.core.operations import AddIndexSafely
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('activities', '0003_archivedactivity'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexSafely(
+            model_name='activity',
+            index=models.Index(fields=['receiver', 'is_read'], name='activities__receive_0d2de2_idx'),
+        ),
+    ]
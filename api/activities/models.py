@@ -5,11 +5,33 @@ from django.contrib.contenttypes.fields import GenericForeignKey
 
 from api.core.models import BaseModel, CharFieldSizes
 
+from api.activities.messages import DETACHED_TARGET_PARAMS, render_title, render_content
+
 
 User = get_user_model()
 
 
-class Activity(BaseModel):
+class RenderedMessageMixin:
+
+    def get_title(self):
+        if self.message_key:
+            return render_title(self.message_key)
+        return self.title
+
+    def get_content(self):
+        # Templated rows only store the variable parts; the sentence is rebuilt from the message key and the sender.
+        if self.message_key:
+            sender_name = self.sender.fullname if self.sender_id else "Someone"
+            return render_content(self.message_key, self.get_message_params(), sender_name, is_self=self.sender_id == self.receiver_id)
+        return self.content
+
+    def get_message_params(self):
+        target = self.target
+        target_params = target.get_message_params() if target is not None else {}
+        return {**DETACHED_TARGET_PARAMS, **self.params, **target_params}
+
+
+class Activity(RenderedMessageMixin, BaseModel):
 
     class Types(models.TextChoices):
         GROUP_MEMBER_ADD = "group_member_add"
@@ -18,8 +40,10 @@ class Activity(BaseModel):
     
     sender = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name="sent_notifications")
     receiver = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name="received_notifications")
-    title = models.CharField(max_length=CharFieldSizes.MEDIUM)
-    content = models.TextField()
+    title = models.CharField(max_length=CharFieldSizes.MEDIUM, blank=True)
+    content = models.TextField(blank=True)
+    message_key = models.CharField(max_length=CharFieldSizes.SMALL, null=True, blank=True)
+    params = models.JSONField(default=dict, blank=True)
     is_read = models.BooleanField(default=False)
     type = models.CharField(max_length=CharFieldSizes.SMALL, choices=Types.choices)
 
@@ -27,5 +51,35 @@ class Activity(BaseModel):
     target_object_id = models.PositiveIntegerField(null=True, blank=True)
     target = GenericForeignKey('target_content_type', 'target_object_id')
 
+    class Meta:
+        indexes = [models.Index(fields=["receiver", "is_read"])]
+
+    def __str__(self):
+        return f'{self.get_title()} -> {self.receiver}'
+
+
+class ArchivedActivity(RenderedMessageMixin, models.Model):
+    """Read activities moved out of the feed table by the `archive_activities` command; ids are kept from Activity."""
+
+    id = models.BigIntegerField(primary_key=True)
+    sender = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name="+")
+    receiver = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name="+")
+    title = models.CharField(max_length=CharFieldSizes.MEDIUM, blank=True)
+    content = models.TextField(blank=True)
+    message_key = models.CharField(max_length=CharFieldSizes.SMALL, null=True, blank=True)
+    params = models.JSONField(default=dict, blank=True)
+    type = models.CharField(max_length=CharFieldSizes.SMALL, choices=Activity.Types.choices)
+
+    target_content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, null=True, blank=True, related_name="+")
+    target_object_id = models.PositiveIntegerField(null=True, blank=True)
+    target = GenericForeignKey('target_content_type', 'target_object_id')
+
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["receiver", "-id"])]
+
     def __str__(self):
-        return f'{self.title} -> {self.receiver}'
+        return f'{self.get_title()} -> {self.receiver} (archived)'
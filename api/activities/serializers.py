@@ -1,10 +1,47 @@
 from rest_framework import serializers
 
-from api.activities.models import Activity
+from api.core.utils import DotsValidationError
+
+from api.groups.models import Group
+from api.expenses.models import Expense
+from api.activities.models import Activity, ArchivedActivity
 
 
 class ActivitySerializer(serializers.ModelSerializer):
+    title = serializers.CharField(source="get_title", read_only=True)
+    content = serializers.CharField(source="get_content", read_only=True)
+    target = serializers.SerializerMethodField()
 
     class Meta:
         model = Activity
-        fields = "__all__"
+        exclude = ["message_key", "params"]
+
+    def get_target(self, obj):
+        # Targets are expected to be prefetched (one query per content type); this only reads loaded fields.
+        target = obj.target
+        if isinstance(target, Group):
+            return {"type": "group", "id": target.id, "name": target.name}
+        if isinstance(target, Expense):
+            return {"type": "expense", "id": target.id, "title": target.title, "amount": str(target.amount), "group": target.group_id}
+        return None
+
+
+class ArchivedActivitySerializer(ActivitySerializer):
+
+    class Meta:
+        model = ArchivedActivity
+        exclude = ["message_key", "params"]
+
+
+class ActivityMarkReadSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=100)
+
+
+class ActivityMarkReadUpToSerializer(serializers.Serializer):
+    id = serializers.IntegerField(min_value=1, required=False)
+    cursor = serializers.CharField(required=False)
+
+    def validate(self, attrs):
+        if ("id" in attrs) == ("cursor" in attrs):
+            raise DotsValidationError({"error": "Provide either `id` or `cursor`."})
+        return attrs
@@ -1,9 +1,16 @@
 import json
 import logging
+from collections import Counter
 
+from django.conf import settings
+from django.db.models import F
 from django.contrib.auth import get_user_model
+from django.utils.module_loading import import_string
 
 from firebase_admin import messaging
+from fcm_django.models import FCMDevice
+
+from api.jobs.utils import enqueue
 
 from api.activities.models import Activity
 
@@ -14,60 +21,96 @@ logger = logging.getLogger(__name__)
 
 class NotificationService:
 
+    def __init__(self, transport=None):
+        self._transport = transport
+
+    @property
+    def transport(self):
+        if self._transport is None:
+            self._transport = import_string(settings.NOTIFICATION_TRANSPORT)()
+        return self._transport
+
+    def build_message(self, device_id, title, body, details, badge=1):
+        notification = messaging.Notification(title=title, body=body)
+        apns_config = messaging.APNSConfig(payload=messaging.APNSPayload(aps=messaging.Aps(badge=badge)))
+        return messaging.Message(notification=notification, data={"key": json.dumps(details)}, token=device_id, apns=apns_config)
+
     def send(self, device_id, title, body, details, badge=1):
         try:
-            notification = messaging.Notification(title=title, body=body)
-            apns_config = messaging.APNSConfig(payload=messaging.APNSPayload(aps=messaging.Aps(badge=badge)))
-            message = messaging.Message(notification=notification, data={"key": json.dumps(details)}, token=device_id, apns=apns_config)
-            messaging.send(message)
+            self.send_many([self.build_message(device_id, title, body, details, badge)])
         except:
             pass
 
+    def send_many(self, messages):
+        batch_size = self.transport.batch_size
+        for start in range(0, len(messages), batch_size):
+            self.transport.send_each(messages[start:start + batch_size])
+
     def create(self, sender, receiver, title, content, type):
         Activity.objects.create(sender=sender, receiver=receiver, title=title, content=content, type=type)
+        self.increment_unread_counts([receiver.id])
+
+    def increment_unread_counts(self, receiver_ids):
+        receivers_by_increment = {}
+        for receiver_id, increment in Counter(rid for rid in receiver_ids if rid is not None).items():
+            receivers_by_increment.setdefault(increment, []).append(receiver_id)
+
+        for increment, ids in receivers_by_increment.items():
+            User.objects.filter(id__in=ids).update(unread_activities_count=F("unread_activities_count") + increment)
 
     def send_create(self, title, content, sender, receiver, type, data=None):
         try:
             if data is None:
                 data = {}
             self.create(sender=sender, receiver=receiver, title=title, content=content, type=type)
-            badge_count = Activity.objects.filter(receiver=receiver, is_read=False).count()
-
-            fcm_user = getattr(receiver, "fcmdevice", None)
-            if fcm_user:
-                self.send(device_id=fcm_user.registration_id, title=title, body=content, details=data, badge=badge_count)
+            self.enqueue_push([(receiver.id, title, content, data)])
         except Exception as e:
             logger.error(f"Error while sending push notification: {e}", exc_info=True)
             pass
 
+    def enqueue_push(self, notifications):
+        # One job per transport batch, so a failed send only retries the messages that batch carried.
+        batch_size = self.transport.batch_size
+        for start in range(0, len(notifications), batch_size):
+            enqueue("activities.push", notifications=notifications[start:start + batch_size])
+
+    def push(self, notifications):
+        # notifications: (receiver_id, title, content, data) tuples; badge counts and devices are loaded once for all receivers.
+        receiver_ids = {receiver_id for receiver_id, *_ in notifications}
+        badge_counts = dict(User.objects.filter(id__in=receiver_ids).values_list("id", "unread_activities_count"))
+        devices = {}
+        for user_id, registration_id in FCMDevice.objects.filter(user_id__in=receiver_ids).order_by("id").values_list("user_id", "registration_id"):
+            devices[user_id] = registration_id
+
+        messages = []
+        for receiver_id, title, content, data in notifications:
+            device_id = devices.get(receiver_id)
+            if device_id:
+                messages.append(self.build_message(device_id=device_id, title=title, body=content, details=data, badge=badge_counts.get(receiver_id, 0)))
+
+        if messages:
+            self.send_many(messages)
+
     def bulk_create(self, activities, create_activity=True):
         try:
             if create_activity:
                 created_activities = Activity.objects.bulk_create(activities)
+                self.increment_unread_counts([activity.receiver_id for activity in created_activities])
                 notification_list = created_activities
             else:
                 notification_list = activities
-            
+
+            notifications = []
             for item in notification_list:
                 if isinstance(item, Activity):
-                    receiver = item.receiver
-                    title = item.title
-                    content = item.content
-                    data = {}
+                    notifications.append((item.receiver_id, item.get_title(), item.get_content(), {}))
                 else:
-                    receiver = item['receiver']
-                    title = item['title']
-                    content = item['content']
-                    data = item.get('data', {})
-                
-                badge_count = Activity.objects.filter(receiver=receiver, is_read=False).count()
-                
-                fcm_user = receiver.fcmdevice_set.last()
-                if fcm_user:
-                    self.send(device_id=fcm_user.registration_id, title=title, body=content, details=data, badge=badge_count)
+                    notifications.append((item['receiver'].id, item['title'], item['content'], item.get('data', {})))
+
+            self.enqueue_push(notifications)
         except Exception as e:
             logger.error(f"Error while sending bulk push notifications: {e}", exc_info=True)
             pass
 
 
-notification_service = NotificationService()
\ No newline at end of file
+notification_service = NotificationService()
@@ -0,0 +1,8 @@
+from api.jobs.utils import job
+
+from api.activities.services import notification_service
+
+
+@job("activities.push")
+def push_notifications(notifications):
+    notification_service.push(notifications)
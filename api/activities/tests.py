@@ -1,3 +1,293 @@
+import json
+from io import StringIO
+from datetime import timedelta
+import base64
+from unittest import mock
+
 from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from fcm_django.models import FCMDevice
+
+from api.core.testing import create_group, create_user, get_client, get_expense_payload, get_view_queryset, get_full_scans, requires_sqlite_plans, reset_query_caches
+from api.jobs.models import Job
+from api.jobs.utils import claim_jobs, run_job
+from api.activities.models import Activity, ArchivedActivity
+from api.activities.services import notification_service
+from api.activities.messages import MessageKeys
+from api.groups.models import GroupMember
+from api.expenses.models import Expense
+from api.activities.transports import LocalTransport
+from api.activities.views import ActivityViewset
+
+
+class FlakyTransport(LocalTransport):
+    batch_size = 2
+
+    def __init__(self, fail_on_call):
+        super().__init__()
+        self.calls = 0
+        self.fail_on_call = fail_on_call
+
+    def send_each(self, messages):
+        self.calls += 1
+        if self.calls == self.fail_on_call:
+            raise ConnectionError("FCM unavailable")
+        return super().send_each(messages)
+
+
+class PushBatchTests(TestCase):
+
+    def setUp(self):
+        self.group, self.members = create_group(5)
+        FCMDevice.objects.bulk_create([FCMDevice(user_id=member.user_id, registration_id=f"device-{member.user_id}", type="android") for member in self.members])
+        self.notifications = [(member.user_id, "Dinner", "You owe 6.00", {}) for member in self.members]
+
+    def run_due_jobs(self):
+        # Retries are scheduled with a backoff; make them due straight away.
+        Job.objects.filter(status=Job.Status.PENDING).update(run_at=timezone.now())
+        return [run_job(job_obj) for job_obj in claim_jobs(10)]
+
+    def test_failed_batch_is_retried_without_resending_delivered_batches(self):
+        transport = FlakyTransport(fail_on_call=2)
+        with mock.patch.object(notification_service, "_transport", transport):
+            with self.captureOnCommitCallbacks(execute=True):
+                notification_service.enqueue_push(self.notifications)
+            self.assertEqual(Job.objects.filter(name="activities.push").count(), 3)
+
+            self.assertEqual(self.run_due_jobs(), [True, False, True])
+            self.assertEqual(self.run_due_jobs(), [True])
+
+        delivered = [message.token for message in transport.outbox]
+        self.assertEqual(sorted(delivered), sorted(f"device-{member.user_id}" for member in self.members))
+
+
+def encode_cursor_payload(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("ascii")).decode("ascii")
+
+
+class ActivityCursorTests(TestCase):
+
+    def setUp(self):
+        self.user = create_user()
+        self.client = get_client(self.user)
+        Activity.objects.bulk_create([Activity(receiver=self.user, type=Activity.Types.EXPENSE_CREATE, title=f"Expense {i}") for i in range(15)])
+
+    def test_cursor_pages_follow_each_other(self):
+        first = self.client.get("/api/activities?cursor=").json()
+        second = self.client.get(f"/api/activities?cursor={first['pagination']['cursor']}").json()
+
+        self.assertEqual(len(first["data"]), 10)
+        self.assertEqual(len(second["data"]), 5)
+        self.assertIsNone(second["pagination"]["cursor"])
+        self.assertFalse({row["id"] for row in first["data"]} & {row["id"] for row in second["data"]})
+
+    def test_tampered_cursors_are_rejected(self):
+        for payload in ({"position": "abc"}, [1], {"a": 1}, {"position": 1.5}, {"position": True}, "position"):
+            with self.subTest(payload=payload):
+                response = self.client.get(f"/api/activities?cursor={encode_cursor_payload(payload)}")
+                self.assertEqual(response.status_code, 404)
+
+        self.assertEqual(self.client.get("/api/activities?cursor=not-base64!").status_code, 404)
+
+    def test_mark_read_up_to_rejects_cursors_without_a_position(self):
+        for payload in ({"position": None}, {"position": "abc"}, [1]):
+            with self.subTest(payload=payload):
+                response = self.client.post("/api/activities/read-up-to", {"cursor": encode_cursor_payload(payload)}, format="json")
+                self.assertEqual(response.status_code, 400)
+
+    def test_mark_read_up_to_cursor_marks_the_position_and_older(self):
+        first = self.client.get("/api/activities?cursor=").json()
+        oldest_seen = first["data"][-1]["id"]
+        response = self.client.post("/api/activities/read-up-to", {"cursor": first["pagination"]["cursor"]}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["updated"], Activity.objects.filter(receiver=self.user, id__lte=oldest_seen).count())
+        self.assertFalse(Activity.objects.filter(receiver=self.user, id__lte=oldest_seen, is_read=False).exists())
+        self.assertFalse(Activity.objects.filter(receiver=self.user, id__gt=oldest_seen, is_read=True).exists())
+
+
+
+class UnreadCounterTests(TestCase):
+
+    def setUp(self):
+        self.users = [create_user() for _ in range(3)]
+        for user, unread in zip(self.users, (4, 0, 2)):
+            Activity.objects.bulk_create([Activity(receiver=user, type=Activity.Types.EXPENSE_CREATE, title="Expense", is_read=i >= unread) for i in range(5)])
+
+    def get_counters(self):
+        return list(get_user_model().objects.filter(id__in=[user.id for user in self.users]).order_by("id").values_list("unread_activities_count", flat=True))
+
+    def reconcile(self):
+        out = StringIO()
+        call_command("reconcile_unread_counts", batch_size=2, stdout=out)
+        return out.getvalue()
+
+    def test_reconcile_restores_drifted_counters(self):
+        get_user_model().objects.filter(id=self.users[0].id).update(unread_activities_count=9)
+        get_user_model().objects.filter(id=self.users[2].id).update(unread_activities_count=1)
+
+        self.assertIn("Reconciled unread counters for 2 users.", self.reconcile())
+        self.assertEqual(self.get_counters(), [4, 0, 2])
+        self.assertIn("Reconciled unread counters for 0 users.", self.reconcile())
+
+    def test_read_up_to_clamp_keeps_upward_drift_visible(self):
+        user = self.users[0]
+        self.reconcile()
+        get_user_model().objects.filter(id=user.id).update(unread_activities_count=7)
+
+        response = get_client(user).post("/api/activities/read-up-to", {"id": Activity.objects.filter(receiver=user).latest("id").id}, format="json")
+
+        # The clamp only stops the counter going below zero; three phantom unread activities remain for reconcile to find.
+        self.assertEqual(response.json()["data"], {"updated": 4, "unread_count": 3})
+        self.assertFalse(Activity.objects.filter(receiver=user, is_read=False).exists())
+        self.assertIn("Reconciled unread counters for 1 users.", self.reconcile())
+        self.assertEqual(self.get_counters()[0], 0)
+
+    def test_read_up_to_clamps_downward_drift_at_zero(self):
+        user = self.users[0]
+        get_user_model().objects.filter(id=user.id).update(unread_activities_count=1)
+
+        response = get_client(user).post("/api/activities/read-up-to", {"id": Activity.objects.filter(receiver=user).latest("id").id}, format="json")
+
+        self.assertEqual(response.json()["data"], {"updated": 4, "unread_count": 0})
+
+
+class ActivityFeedQueryTests(TestCase):
+
+    def setUp(self):
+        reset_query_caches()
+        self.group, self.members = create_group(3)
+        self.owner = self.group.created_by
+        self.client = get_client(self.owner)
+
+    def add_activities(self, count):
+        for _ in range(count):
+            response = self.client.post("/api/expenses", get_expense_payload(self.group, self.members), format="json")
+            self.assertEqual(response.status_code, 201)
+        Activity.objects.bulk_create([Activity(receiver=self.owner, type=Activity.Types.GROUP_MEMBER_ADD, title="Added", target=self.group) for _ in range(count)])
+
+    def test_feed_loads_targets_with_one_query_per_content_type(self):
+        for count in (1, 4):
+            with self.subTest(activities=count):
+                self.add_activities(count)
+                with self.assertNumQueries(4):
+                    response = self.client.get("/api/activities?perPage=50")
+
+                targets = [row["target"] for row in response.json()["data"]]
+                self.assertEqual({target["type"] for target in targets}, {"group", "expense"})
+                self.assertTrue(all(target["title"] == "Dinner" and target["amount"] == "30.00" for target in targets if target["type"] == "expense"))
+
+
+
+class ActivityMessageTests(TestCase):
+
+    def setUp(self):
+        self.group, self.members = create_group(2)
+        self.owner = self.group.created_by
+        self.member = self.members[1]
+        self.expense_id = get_client(self.owner).post("/api/expenses", get_expense_payload(self.group, self.members), format="json").json()["data"]["id"]
+
+    def get_member_feed(self):
+        return {row["type"]: row["content"] for row in get_client(self.member.user).get("/api/activities").json()["data"]}
+
+    def test_params_hold_ids_and_names_follow_renames(self):
+        activity = Activity.objects.get(receiver=self.member.user, type=Activity.Types.EXPENSE_CREATE)
+        self.assertEqual(activity.params, {"group_id": self.group.id, "expense_id": self.expense_id, "amount": "15.00"})
+
+        self.group.name = "Road trip"
+        self.group.save()
+        Expense.objects.filter(id=self.expense_id).update(title="Brunch")
+
+        self.assertEqual(self.get_member_feed()[Activity.Types.EXPENSE_CREATE], "New expense added by Group Owner in the group 'Road trip', 'Brunch'. Your share is $15.00.")
+
+    def test_group_member_add_renders_the_current_group_name(self):
+        newcomer = create_user(fullname="Newcomer")
+        GroupMember.objects.create(group=self.group, user=newcomer)
+        self.group.name = "Road trip"
+        self.group.save()
+
+        activity = Activity.objects.get(receiver=newcomer, type=Activity.Types.GROUP_MEMBER_ADD)
+        self.assertEqual(activity.params, {"group_id": self.group.id})
+        self.assertIn("the new group 'Road trip'", activity.get_content())
+
+    def test_detached_targets_fall_back_to_stored_or_neutral_names(self):
+        Expense.objects.get(id=self.expense_id).delete()
+        legacy = Activity.objects.create(receiver=self.member.user, sender=self.owner, type=Activity.Types.EXPENSE_UPDATE, message_key=MessageKeys.EXPENSE_UPDATE, params={"group": "Old trip", "expense": "Old dinner", "amount": "5.00"})
+
+        feed = self.get_member_feed()
+        self.assertEqual(feed[Activity.Types.EXPENSE_CREATE], "New expense added by Group Owner in the group 'a removed group', 'a removed expense'. Your share is $15.00.")
+        self.assertIn("in the group 'Old trip', 'Old dinner'", legacy.get_content())
+
+
+class ArchiveActivitiesTests(TestCase):
+
+    def setUp(self):
+        self.user = create_user()
+        self.client = get_client(self.user)
+
+    def add_activities(self, count, is_read, days_old):
+        activities = Activity.objects.bulk_create([Activity(receiver=self.user, type=Activity.Types.EXPENSE_CREATE, title=f"Expense {i}", is_read=is_read) for i in range(count)])
+        Activity.objects.filter(id__in=[activity.id for activity in activities]).update(created_at=timezone.now() - timedelta(days=days_old))
+        return [activity.id for activity in activities]
+
+    def archive(self, batch_size):
+        out = StringIO()
+        call_command("archive_activities", days=90, batch_size=batch_size, stdout=out)
+        return out.getvalue()
+
+    def test_archives_across_batch_boundaries(self):
+        for expired_count, batch_size in ((6, 3), (7, 3), (2, 3)):
+            with self.subTest(expired=expired_count, batch_size=batch_size):
+                expired_ids = self.add_activities(expired_count, is_read=True, days_old=120)
+
+                self.assertIn(f"Archived {expired_count} activities", self.archive(batch_size))
+                self.assertFalse(Activity.objects.filter(id__in=expired_ids).exists())
+                self.assertEqual(set(ArchivedActivity.objects.filter(id__in=expired_ids).values_list("id", flat=True)), set(expired_ids))
+
+    def test_unread_and_recent_activities_stay_in_the_feed(self):
+        unread_ids = self.add_activities(2, is_read=False, days_old=120)
+        recent_ids = self.add_activities(2, is_read=True, days_old=10)
+        archived_ids = self.add_activities(4, is_read=True, days_old=120)
+        self.user.unread_activities_count = 2
+        self.user.save(update_fields=["unread_activities_count"])
+
+        self.archive(batch_size=3)
+
+        self.assertEqual(set(Activity.objects.values_list("id", flat=True)), set(unread_ids + recent_ids))
+        self.assertEqual(set(ArchivedActivity.objects.values_list("id", flat=True)), set(archived_ids))
+        self.user.refresh_from_db()
+        # Only read rows are archived, so the counter still matches the feed's unread rows.
+        self.assertEqual(self.user.unread_activities_count, Activity.objects.filter(receiver=self.user, is_read=False).count())
+
+        history = self.client.get("/api/activities/history").json()
+        self.assertEqual({row["id"] for row in history["data"]}, set(archived_ids))
+
+
+class FeedBenchmarkCommandTests(TestCase):
+
+    def test_benchmark_times_the_feed_around_archiving_and_cleans_up(self):
+        out = StringIO()
+        call_command("benchmark_activity_feed", rows=50, receivers=5, expired_ratio=0.8, iterations=3, batch_size=20, stdout=out)
+
+        output = out.getvalue()
+        self.assertIn("Seeded 50 activities for 5 receivers.", output)
+        self.assertIn("Feed table before archiving: 50 rows", output)
+        self.assertIn("Archived 40 activities", output)
+        self.assertIn("Feed table after archiving: 10 rows", output)
+        self.assertEqual(output.count("median"), 4)
+        self.assertFalse(Activity.objects.exists())
+        self.assertFalse(ArchivedActivity.objects.exists())
+
+
+@requires_sqlite_plans
+class QueryPlanTests(TestCase):
+
+    def test_feed_queries_use_indexes(self):
+        user = create_user()
+        feed = get_view_queryset(ActivityViewset, user)
 
-# Create your tests here.
+        for queryset in (feed, feed.filter(is_read=False), feed.filter(id__lte=100, is_read=False), ArchivedActivity.objects.filter(receiver=user).order_by("-id")):
+            with self.subTest(query=str(queryset.query)[-80:]):
+                self.assertEqual(get_full_scans(queryset), [])
@@ -0,0 +1,22 @@
+from firebase_admin import messaging
+
+
+class FCMTransport:
+    batch_size = 500
+
+    def send_each(self, messages):
+        return messaging.send_each(messages)
+
+
+class LocalTransport:
+    """
+    Keeps messages in memory instead of delivering them, for tests, benchmarks and local development.
+    """
+    batch_size = 500
+
+    def __init__(self):
+        self.outbox = []
+
+    def send_each(self, messages):
+        self.outbox.extend(messages)
+        return messaging.BatchResponse([messaging.SendResponse({"name": str(len(self.outbox))}, None) for _ in messages])
@@ -1,30 +1,89 @@
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
 from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.prefetch import GenericPrefetch
 
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
 from api.core.mixin import GenericDotsViewSet, ListModelMixin
+from api.core.utils import DotsValidationError
 
-from api.activities.models import Activity
-from api.activities.serializers import ActivitySerializer
+from api.groups.models import Group
+from api.expenses.models import Expense
+from api.activities.models import Activity, ArchivedActivity
+from api.activities.serializers import ActivitySerializer, ArchivedActivitySerializer, ActivityMarkReadSerializer, ActivityMarkReadUpToSerializer
 
 
 User = get_user_model()
 
+MARK_READ_BATCH_SIZE = 500
+
+
+def get_target_prefetch():
+    # Expense messages render the group's name too, so it is joined into the expense query rather than loaded per row.
+    return GenericPrefetch("target", [Group.objects.all(), Expense.objects.select_related("group")])
+
 
 class ActivityViewset(GenericDotsViewSet, ListModelMixin):
     serializer_class = ActivitySerializer
     queryset = Activity.objects.all()
     permission_classes = [IsAuthenticated]
+    cursor_field = "id"
 
     def get_queryset(self):
-        return super().get_queryset().filter(receiver=self.request.user).order_by('-id')
+        return super().get_queryset().filter(receiver=self.request.user).select_related("sender").prefetch_related(get_target_prefetch()).order_by('-id')
 
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
-        
-        un_read = queryset.filter(is_read=False)
-        un_read.update(is_read=True)
-        
         page = self.paginate_queryset(queryset)
         serializer = self.get_serializer(page, many=True, context={"request": request})
         return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=["GET"], url_path="history", serializer_class=ArchivedActivitySerializer)
+    def history(self, request, *args, **kwargs):
+        queryset = ArchivedActivity.objects.filter(receiver=request.user).select_related("sender").prefetch_related(get_target_prefetch()).order_by("-id")
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True, context={"request": request})
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=["POST"], url_path="read", serializer_class=ActivityMarkReadSerializer)
+    def mark_read(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        updated = self.get_queryset().filter(id__in=serializer.validated_data["ids"], is_read=False).update(is_read=True)
+        return self.get_mark_read_response(updated)
+
+    @action(detail=False, methods=["POST"], url_path="read-up-to", serializer_class=ActivityMarkReadUpToSerializer)
+    def mark_read_up_to(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        if "cursor" in serializer.validated_data:
+            try:
+                position = self.paginator.decode_cursor(serializer.validated_data["cursor"])
+            except NotFound:
+                position = None
+            if position is None:
+                raise DotsValidationError({"error": "Invalid cursor."})
+        else:
+            position = serializer.validated_data["id"]
+
+        unread = self.get_queryset().filter(id__lte=position, is_read=False)
+        updated = 0
+        while True:
+            batch_ids = list(unread.values_list("id", flat=True)[:MARK_READ_BATCH_SIZE])
+            if not batch_ids:
+                break
+            updated += Activity.objects.filter(id__in=batch_ids, is_read=False).update(is_read=True)
+
+        return self.get_mark_read_response(updated)
+
+    def get_mark_read_response(self, updated):
+        if updated:
+            User.objects.filter(id=self.request.user.id).update(unread_activities_count=Greatest(F("unread_activities_count") - updated, Value(0)))
+        unread_count = User.objects.values_list("unread_activities_count", flat=True).get(id=self.request.user.id)
+        return Response({"data": {"updated": updated, "unread_count": unread_count}}, status=status.HTTP_200_OK)
@@ -0,0 +1,24 @@
+from django.dispatch import receiver
+from django.db.models.signals import post_save, pre_delete, post_delete
+
+from api.categories.models import Category
+from api.expenses.models import DailySpending
+
+from api.users.utils import invalidate_all_dashboard_caches
+from api.categories.utils import invalidate_categories
+from api.expenses.utils import apply_spending_deltas
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def clear_category_catalogue(sender, instance, **kwargs):
+    invalidate_categories()
+    invalidate_all_dashboard_caches()
+
+
+@receiver(pre_delete, sender=Category)
+def fold_category_spending(sender, instance, **kwargs):
+    # Expense.category is SET_NULL, so the category's rollup rows move into each day's uncategorised bucket.
+    rows = DailySpending.objects.filter(category=instance)
+    apply_spending_deltas({(user_id, day, None): amount for user_id, day, amount in rows.values_list("user_id", "day", "amount")})
+    rows.delete()
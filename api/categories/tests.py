@@ -1,3 +1,24 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+
+from api.categories.models import Category
+from api.categories.utils import CATEGORY_CATALOGUE_CACHE_KEY, get_categories
+from api.core.testing import reset_query_caches
+
+
+class CategoryCatalogueCacheTests(TestCase):
+
+    def setUp(self):
+        reset_query_caches()
+
+    @override_settings(CATEGORY_CACHE_TIMEOUT=60)
+    def test_catalogue_is_cached_with_a_finite_timeout(self):
+        with mock.patch("api.categories.utils.cache.set") as cache_set:
+            get_categories()
+        cache_set.assert_called_once_with(CATEGORY_CATALOGUE_CACHE_KEY, mock.ANY, 60)
+
+    def test_category_writes_clear_the_catalogue(self):
+        get_categories()
+        category = Category.objects.create(name="Pets")
+        self.assertIn({"id": category.id, "name": "Pets"}, get_categories())
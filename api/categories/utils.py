@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from api.categories.models import Category
+
+
+CATEGORY_CATALOGUE_CACHE_KEY = "categories:catalogue"
+
+
+def get_categories():
+    # The catalogue is small and rarely written. A Category signal clears it, but only in the cache of the process that
+    # wrote, so the timeout bounds how long other workers on a per-process cache can serve a stale list.
+    categories = cache.get(CATEGORY_CATALOGUE_CACHE_KEY)
+    if categories is None:
+        categories = list(Category.objects.order_by("id").values("id", "name"))
+        cache.set(CATEGORY_CATALOGUE_CACHE_KEY, categories, settings.CATEGORY_CACHE_TIMEOUT)
+    return categories
+
+
+def get_category_map():
+    return {category["id"]: category for category in get_categories()}
+
+
+def invalidate_categories():
+    cache.delete(CATEGORY_CATALOGUE_CACHE_KEY)
@@ -6,9 +6,15 @@ from api.core.mixin import GenericDotsViewSet
 from api.categories.models import Category
 
 from api.categories.serializers import CategorySerializer
+from api.categories.utils import get_categories
 
 
 class CategoryViewset(GenericDotsViewSet, ListModelMixin):
     serializer_class = CategorySerializer
     queryset = Category.objects.all()
     permission_classes = [IsAuthenticated]
+
+    def list(self, request, *args, **kwargs):
+        # Served from the cached catalogue, which already has the serializer's shape.
+        page = self.paginate_queryset(get_categories())
+        return self.get_paginated_response(page)
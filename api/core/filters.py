@@ -1,8 +1,8 @@
 import django_filters
 
-from django.db.models import Q
 from django.contrib.auth import get_user_model
 
+from api.users.search import get_user_search_backend
 from api.groups.models import GroupMember
 from api.expenses.models import Expense
 
@@ -18,9 +18,7 @@ class UserFilter(django_filters.rest_framework.FilterSet):
         fields = ['search']
     
     def filter_search(self, queryset, name, value):
-        return queryset.filter(
-            Q(email__icontains=value) | Q(fullname__icontains=value)
-        )
+        return get_user_search_backend().search(queryset, value)
 
 
 class ExpenseFilter(django_filters.FilterSet):
@@ -0,0 +1,49 @@
+from api.groups.models import GroupMember
+
+
+class MembershipCache:
+    """Identity map of group memberships, shared by everything that validates one request."""
+
+    def __init__(self, user):
+        self.user = user
+        self._memberships = None
+        self._group_members = {}
+
+    @property
+    def memberships(self):
+        if self._memberships is None:
+            self._memberships = {gm.group_id: gm for gm in GroupMember.objects.filter(user=self.user).select_related("group")}
+        return self._memberships
+
+    def get_membership(self, group_id):
+        return self.memberships.get(group_id)
+
+    def is_member(self, group_id):
+        return group_id in self.memberships
+
+    def get_group_members(self, group_id):
+        if group_id not in self._group_members:
+            self._group_members[group_id] = {gm.id: gm for gm in GroupMember.objects.filter(group_id=group_id)}
+        return self._group_members[group_id]
+
+    def get_members(self, group_id, member_ids):
+        # Returns None when any id is not a member of the group, so callers can reject the payload.
+        group_members = self.get_group_members(group_id)
+        if not set(member_ids) <= group_members.keys():
+            return None
+        return {gm_id: group_members[gm_id] for gm_id in member_ids}
+
+    def lock_members(self, group_id, member_ids):
+        # Validation reads memberships before the write transaction starts; re-reading them under a row lock inside it
+        # rejects a member removed in between instead of failing the split foreign keys at commit.
+        member_ids = set(member_ids)
+        locked_ids = set(GroupMember.objects.select_for_update().filter(group_id=group_id, id__in=member_ids).values_list("id", flat=True))
+        return locked_ids == member_ids
+
+
+def get_membership_cache(request):
+    cache = getattr(request, "_membership_cache", None)
+    if cache is None or cache.user != request.user:
+        cache = MembershipCache(request.user)
+        request._membership_cache = cache
+    return cache
@@ -120,6 +120,22 @@ class GenericDotsViewSet(GenericViewSet):
     def filter_metaclass_queryset(self, queryset):
         return queryset
 
+    def has_document_query(self):
+        if self.action != "list":
+            return False
+        return bool(self.request.query_params.get("search", None)) or any(field in self.request.query_params for field in self.filter_fields)
+
+    def filter_queryset(self, queryset):
+        document = self.get_document()
+        if document is None or not self.has_document_query() or not document.is_available(queryset.db):
+            return super().filter_queryset(queryset)
+
+        # The document store takes over `search`; the remaining backends narrow the queryset it ranks within.
+        for backend in self.filter_backends:
+            if not issubclass(backend, filters.SearchFilter):
+                queryset = backend().filter_queryset(self.request, queryset, self)
+        return self.document_filter(document.search(queryset))
+
     def document_filter(self, elastic_document):
         was_filtered = False
         if self.request.query_params.get("search", None):
@@ -147,6 +163,9 @@ class GenericDotsViewSet(GenericViewSet):
     def get_search_queryset(self, search_value):
         return [], {}
 
+    def get_serializer_document(self, documents):
+        return self.get_serializer(documents, many=True).data
+
     def get_paginated_response(self, data, json=False):
         """
         Return a paginated style `Response` object for the given output data.
@@ -191,7 +210,7 @@ class GenericDotsViewSet(GenericViewSet):
             pages = count / per_page
             total = int(pages) + 1 if pages > int(pages) else int(pages)
 
-        queryset = documents[offset : per_page * page].execute().to_dict()
+        queryset = documents[offset : per_page * page].execute()
         response = self.get_serializer_document(queryset)
         links = {"next": None, "previous": None}
         if current_page < total:
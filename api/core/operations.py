@@ -0,0 +1,22 @@
+from django.db.migrations.operations import AddIndex
+
+
+class AddIndexSafely(AddIndex):
+    """AddIndex that runs django.contrib.postgres's AddIndexConcurrently on PostgreSQL so large tables stay writable.
+
+    Migrations using it must set `atomic = False`.
+    """
+
+    def get_database_operation(self, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return super()
+        # Imported lazily: django.contrib.postgres needs psycopg, which SQLite deployments don't install.
+        from django.contrib.postgres.operations import AddIndexConcurrently
+
+        return AddIndexConcurrently(self.model_name, self.index)
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        self.get_database_operation(schema_editor).database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        self.get_database_operation(schema_editor).database_backwards(app_label, schema_editor, from_state, to_state)
@@ -8,6 +8,7 @@ from django.template.loader import get_template
 from django.utils import timezone
 
 from api.core.utils import DotsValidationError
+from api.jobs.utils import enqueue
 
 
 def get_random_otp():
@@ -25,6 +26,10 @@ def get_otp_verified_token(otp, content):
 
 
 def send_confirmation_code(new_otp, otp_type):
+    enqueue("jwtauth.send_confirmation_code", otp_id=new_otp.id, otp_type=otp_type)
+
+
+def deliver_confirmation_code(new_otp, otp_type):
     email_subject = "Splitpeer OTP Verification."
     text_content = email_subject
     text_template = get_template("email_templates/verify-code-email.html")
@@ -43,6 +48,10 @@ def verify_otp(user_otp):
 
 
 def send_report_email(data):
+    enqueue("jwtauth.send_report_email", data=data)
+
+
+def deliver_report_email(data):
     email_subject = "Splitpeer Report Problem."
     text_content = email_subject
     text_template = get_template("email_templates/report-email.html")
@@ -1,5 +1,11 @@
+import json
+import base64
+import binascii
+
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 DEFAULT_PAGE = 1
 
@@ -7,18 +13,85 @@ DEFAULT_PAGE = 1
 class CustomPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = "perPage"
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
 
-    def get_paginated_response(self, data, json=False):
-        custom_paginator = {
+    def paginate_queryset(self, queryset, request, view=None):
+        # Views opt in to keyset pagination by declaring `cursor_field`; clients select it by sending `cursor` (empty for the first page).
+        self.cursor_field = getattr(view, "cursor_field", None)
+        self.use_cursor = bool(self.cursor_field) and self.cursor_query_param in request.query_params
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request.query_params.get(self.cursor_query_param))
+
+        queryset = queryset.order_by(f"-{self.cursor_field}")
+        if position is not None:
+            queryset = queryset.filter(**{f"{self.cursor_field}__lt": position})
+
+        results = list(queryset[:page_size + 1])
+        self.has_next = len(results) > page_size
+        self.page_results = results[:page_size]
+        return self.page_results
+
+    def decode_cursor(self, token):
+        if not token:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode("ascii")).decode("ascii"))
+        except (TypeError, ValueError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+        # Cursors travel through clients, so only accept the shape encode_cursor produces: an integer position (or null).
+        if not isinstance(payload, dict) or "position" not in payload:
+            raise NotFound(self.invalid_cursor_message)
+        position = payload["position"]
+        if position is not None and (not isinstance(position, int) or isinstance(position, bool)):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def encode_cursor(self, position):
+        return base64.urlsafe_b64encode(json.dumps({"position": position}).encode("ascii")).decode("ascii")
+
+    def get_next_cursor(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(getattr(self.page_results[-1], self.cursor_field))
+
+    def get_cursor_paginated_data(self, data):
+        next_cursor = self.get_next_cursor()
+        url = self.request.build_absolute_uri()
+        return {
             "data": data,
             "pagination": {
-                "count": self.page.paginator.count,
-                "total": self.page.paginator.num_pages,
-                "perPage": int(self.request.GET.get("perPage", self.page_size)),
-                "currentPage": int(self.request.GET.get("page", DEFAULT_PAGE)),
-                "links": {"next": self.get_next_link(), "previous": self.get_previous_link()},
+                "count": None,
+                "total": None,
+                "perPage": self.get_page_size(self.request),
+                "currentPage": None,
+                "cursor": next_cursor,
+                "links": {
+                    "next": replace_query_param(url, self.cursor_query_param, next_cursor) if next_cursor else None,
+                    "previous": None,
+                },
             },
         }
+
+    def get_paginated_response(self, data, json=False):
+        if getattr(self, "use_cursor", False):
+            custom_paginator = self.get_cursor_paginated_data(data)
+        else:
+            custom_paginator = {
+                "data": data,
+                "pagination": {
+                    "count": self.page.paginator.count,
+                    "total": self.page.paginator.num_pages,
+                    "perPage": int(self.request.GET.get("perPage", self.page_size)),
+                    "currentPage": int(self.request.GET.get("page", DEFAULT_PAGE)),
+                    "links": {"next": self.get_next_link(), "previous": self.get_previous_link()},
+                },
+            }
         if json is False:
             return Response(custom_paginator)
         else:
@@ -24,8 +24,8 @@ class IsOwner(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return True
 
-        if hasattr(obj, "created_by"):
-            return obj.created_by == request.user
-        if hasattr(obj, "created_for"):
-            return obj.created_for == request.user
+        if hasattr(obj, "created_by_id"):
+            return obj.created_by_id == request.user.id
+        if hasattr(obj, "created_for_id"):
+            return obj.created_for_id == request.user.id
         return False
@@ -0,0 +1,10 @@
+from api.groups.models import GroupMember
+
+
+def get_user_group_ids(user):
+    return GroupMember.objects.filter(user=user).values("group_id")
+
+
+def filter_by_membership(queryset, user, group_field="group"):
+    # An IN subquery on GroupMember keeps one row per object, so callers never need DISTINCT to undo a fan-out join.
+    return queryset.filter(**{f"{group_field}__in": get_user_group_ids(user)})
@@ -0,0 +1,65 @@
+import re
+from types import SimpleNamespace
+from unittest import skipUnless
+
+from django.db import connection
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+
+from rest_framework.test import APIClient
+
+from api.groups.models import Group, GroupMember
+
+
+User = get_user_model()
+
+
+def create_user(email=None, fullname="Group Owner"):
+    email = email or f"owner{User.objects.count()}@example.com"
+    return User.objects.create_user(email=email, password="Passw0rd!", fullname=fullname)
+
+
+def create_group(member_count, owner=None):
+    # Members beyond the owner are bulk inserted, so large groups stay cheap to build and skip the per-member signals.
+    owner = owner or create_user()
+    group = Group.objects.create(created_by=owner, name="Weekend trip", description="Cabin by the lake", thumbnail="group_thumbnails/trip.png")
+    users = User.objects.bulk_create([User(email=f"member{i}.{group.id}@example.com", fullname=f"Member {i}") for i in range(1, member_count)])
+    GroupMember.objects.bulk_create([GroupMember(group=group, user=user) for user in users])
+    return group, list(group.members.select_related("user").order_by("id"))
+
+
+def get_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def get_expense_payload(group, members, amount="30.00", **extra):
+    payload = {"group": group.id, "title": "Dinner", "amount": amount, "paid_by": members[0].id, "split_type": "equal", "splits": [{"participant": member.id, "is_included": True} for member in members]}
+    payload.update(extra)
+    return payload
+
+
+def get_view_queryset(viewset_class, user, action="list"):
+    view = viewset_class(action=action)
+    view.request = SimpleNamespace(user=user, query_params={})
+    return view.get_queryset()
+
+
+requires_sqlite_plans = skipUnless(connection.vendor == "sqlite", "Plans are checked against SQLite's EXPLAIN QUERY PLAN output.")
+
+
+def get_query_plan(queryset):
+    return queryset.explain()
+
+
+def get_full_scans(queryset):
+    # SQLite reports a scan without an index as "SCAN <table>"; "SCAN <table> USING [COVERING] INDEX ..." is fine.
+    return [line for line in get_query_plan(queryset).splitlines() if re.search(r"\bSCAN \S+$", line)]
+
+
+def reset_query_caches():
+    # Query-count tests must not depend on which earlier test warmed the content type or catalogue caches.
+    ContentType.objects.clear_cache()
+    cache.clear()
@@ -1,7 +1,8 @@
 from django.contrib import admin
 
-from api.expenses.models import Expense, ExpenseSplit
+from api.expenses.models import Expense, ExpenseSplit, DailySpending
 
 
 admin.site.register(Expense)
 admin.site.register(ExpenseSplit)
+admin.site.register(DailySpending)
@@ -0,0 +1,15 @@
+from api.search.documents import Document, registry
+
+from api.expenses.models import Expense
+
+
+@registry.register_document
+class ExpenseDocument(Document):
+
+    class Index:
+        name = "expenses"
+        weights = {"title": 10}
+
+    class Django:
+        model = Expense
+        fields = ["title", "notes"]
@@ -0,0 +1,45 @@
+from django.db import transaction
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from api.expenses.utils import get_live_daily_spending, get_stored_daily_spending, rebuild_daily_spending
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Compare DailySpending rollups with live ExpenseSplit aggregates and report (or fix) drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--fix", action="store_true", help="Rebuild the rollups of users that drifted.")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last_id = 0
+        drifted_users = 0
+
+        while True:
+            user_ids = list(User.objects.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:batch_size])
+            if not user_ids:
+                break
+            last_id = user_ids[-1]
+
+            live = get_live_daily_spending(user_ids)
+            stored = {key: amount for key, amount in get_stored_daily_spending(user_ids).items() if amount}
+            mismatched = {key for key in live.keys() | stored.keys() if live.get(key, 0) != stored.get(key, 0)}
+            if not mismatched:
+                continue
+
+            for user_id, day, category_id in sorted(mismatched, key=str):
+                self.stdout.write(f"user={user_id} day={day} category={category_id}: stored={stored.get((user_id, day, category_id), 0)} live={live.get((user_id, day, category_id), 0)}")
+
+            users = sorted({user_id for user_id, _, _ in mismatched})
+            drifted_users += len(users)
+            if options["fix"]:
+                with transaction.atomic():
+                    rebuild_daily_spending(users)
+
+        action = "Fixed" if options["fix"] else "Found"
+        self.stdout.write(f"{action} drift for {drifted_users} users.")
@@ -0,0 +1,32 @@
+from django.db import transaction
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from api.expenses.utils import rebuild_daily_spending
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Rebuild DailySpending rollups from ExpenseSplit rows, one batch of users at a time."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last_id = 0
+        rebuilt = 0
+
+        while True:
+            user_ids = list(User.objects.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:batch_size])
+            if not user_ids:
+                break
+            last_id = user_ids[-1]
+
+            with transaction.atomic():
+                rebuild_daily_spending(user_ids)
+            rebuilt += len(user_ids)
+
+        self.stdout.write(f"Rebuilt daily spending for {rebuilt} users.")
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+from api.core.operations import AddIndexSafely
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('categories', '0001_initial'),
+        ('expenses', '0003_expenseitem'),
+        ('groups', '0006_groupmember_groups_grou_user_id_4df01d_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexSafely(
+            model_name='expense',
+            index=models.Index(fields=['group', '-created_at'], name='expenses_ex_group_i_9a9aab_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:36
+
+from django.db import migrations, models
+
+from api.core.operations import AddIndexSafely
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('expenses', '0004_expense_expenses_ex_group_i_9a9aab_idx'),
+        ('groups', '0006_groupmember_groups_grou_user_id_4df01d_idx'),
+    ]
+
+    operations = [
+        AddIndexSafely(
+            model_name='expensesplit',
+            index=models.Index(fields=['participant', 'is_included'], name='expenses_ex_partici_49475d_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily_spending(apps, schema_editor):
+    ExpenseSplit = apps.get_model("expenses", "ExpenseSplit")
+    DailySpending = apps.get_model("expenses", "DailySpending")
+
+    rows = ExpenseSplit.objects.filter(is_included=True, amount__isnull=False).annotate(day=TruncDate("expense__created_at")).values("participant__user_id", "day", "expense__category_id").annotate(total=Sum("amount")).order_by()
+    DailySpending.objects.bulk_create((DailySpending(user_id=row["participant__user_id"], day=row["day"], category_id=row["expense__category_id"], amount=row["total"]) for row in rows.iterator()), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0001_initial'),
+        ('expenses', '0005_expensesplit_expenses_ex_partici_49475d_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySpending',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('day', models.DateField()),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='daily_spendings', to='categories.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_spendings', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'day', 'category')},
+            },
+        ),
+        migrations.RunPython(backfill_daily_spending, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:10
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def merge_uncategorised_duplicates(apps, schema_editor):
+    # Concurrent writes could leave several NULL-category rows for one user and day; fold them into one before the constraint.
+    DailySpending = apps.get_model("expenses", "DailySpending")
+
+    duplicates = DailySpending.objects.filter(category__isnull=True).values("user_id", "day").annotate(rows=Count("id"), total=Sum("amount")).filter(rows__gt=1).order_by()
+    for row in duplicates.iterator():
+        keep, *extra = DailySpending.objects.filter(user_id=row["user_id"], day=row["day"], category__isnull=True).order_by("id").values_list("id", flat=True)
+        DailySpending.objects.filter(id__in=extra).delete()
+        DailySpending.objects.filter(id=keep).update(amount=row["total"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0001_initial'),
+        ('expenses', '0006_dailyspending'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_uncategorised_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='dailyspending',
+            constraint=models.UniqueConstraint(condition=models.Q(('category__isnull', True)), fields=('user', 'day'), name='expenses_dailyspending_uncategorised_uniq'),
+        ),
+    ]
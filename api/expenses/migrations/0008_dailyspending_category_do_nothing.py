@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0001_initial'),
+        ('expenses', '0007_dailyspending_uncategorised_uniq'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dailyspending',
+            name='category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='daily_spendings', to='categories.category'),
+        ),
+    ]
@@ -28,9 +28,15 @@ class Expense(BaseModel):
     split_type = models.CharField(max_length=CharFieldSizes.SMALL, choices=SplitType)
     created_by = models.ForeignKey(User, related_name="expenses_created_by", on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [models.Index(fields=["group", "-created_at"])]
+
     def __str__(self):
         return f"{self.title} - {self.amount} ({self.group.name})"
 
+    def get_message_params(self):
+        return {"group": self.group.name, "expense": self.title}
+
 
 class ExpenseSplit(BaseModel):
     expense = models.ForeignKey(Expense, related_name="expense_splits", on_delete=models.CASCADE)
@@ -41,6 +47,7 @@ class ExpenseSplit(BaseModel):
     
     class Meta:
         unique_together = ("expense", "participant")
+        indexes = [models.Index(fields=["participant", "is_included"])]
     
     def __str__(self):
         return f"{self.expense.title} - {self.participant.user.get_full_name()} ({self.get_display_value()})"
@@ -61,3 +68,22 @@ class ExpenseItem(BaseModel):
 
     def __str__(self):
         return f"{self.title} - {self.assignee.user.get_full_name()} (${self.amount})"
+
+
+class DailySpending(BaseModel):
+    """Per-user, per-day, per-category sum of included split amounts, maintained by the expense write paths."""
+
+    user = models.ForeignKey(User, related_name="daily_spendings", on_delete=models.CASCADE)
+    day = models.DateField()
+    # Deleting a category folds its rows into the uncategorised bucket (see api.categories.signals); SET_NULL would
+    # collide with that bucket's unique constraint.
+    category = models.ForeignKey(Category, related_name="daily_spendings", on_delete=models.DO_NOTHING, null=True, blank=True)
+    amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ("user", "day", "category")
+        # NULLs are distinct in unique indexes, so uncategorised spending needs its own constraint.
+        constraints = [models.UniqueConstraint(fields=["user", "day"], condition=models.Q(category__isnull=True), name="expenses_dailyspending_uncategorised_uniq")]
+
+    def __str__(self):
+        return f"{self.user} on {self.day}: {self.amount}"
@@ -1,21 +1,21 @@
 from decimal import Decimal
 
 from django.db import transaction
-from django.db.models import Sum
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 from rest_framework import serializers
 
 from api.core.utils import DotsValidationError
+from api.core.membership import get_membership_cache
 
 from api.expenses.models import Expense, ExpenseSplit, ExpenseItem
-from api.groups.models import Group, GroupMember
 
 from api.groups.serializers import GroupMemberSerializer
-from api.categories.serializers import CategorySerializer
+from api.groups.utils import update_group_stats
+from api.categories.utils import get_category_map
 
-from api.expenses.utils import create_expense_activity
+from api.expenses.utils import create_expense_activity, schedule_expense_update_activity, get_balance_deltas, merge_balance_deltas, apply_balance_deltas, get_member_user_ids, get_expense_day, get_spending_deltas, apply_spending_deltas
 
 
 User = get_user_model()
@@ -39,7 +39,7 @@ class ExpenseItemSerializer(serializers.ModelSerializer):
 
 class ExpenseSerializer(serializers.ModelSerializer):
     paid_by = GroupMemberSerializer(read_only=True)
-    category = CategorySerializer(read_only=True)
+    category = serializers.SerializerMethodField()
     splits = ExpenseSplitSerializer(source="expense_splits", many=True, read_only=True)
     items = ExpenseItemSerializer(many=True, read_only=True)
     
@@ -50,6 +50,11 @@ class ExpenseSerializer(serializers.ModelSerializer):
             "split_type", "splits", "items", "created_by", "created_at", "updated_at"
         ]
 
+    def get_category(self, obj):
+        if obj.category_id is None:
+            return None
+        return get_category_map().get(obj.category_id)
+
 
 class ExpenseSplitInputSerializer(serializers.Serializer):
     participant = serializers.IntegerField(required=True)
@@ -96,14 +101,15 @@ class ExpenseCreateSerializer(serializers.ModelSerializer):
         split_type = attrs["split_type"]
         splits = attrs.get("splits", None)
         items = attrs.get("items", [])
+        membership_cache = get_membership_cache(request)
         
-        if not Group.objects.filter(id=group.id, created_by=request.user):
+        if group.created_by_id != request.user.id:
             raise DotsValidationError({"error": "You do not have permissions to add expense in this group."})
 
-        if not GroupMember.objects.filter(group=group, user=request.user).exists():
+        if not membership_cache.is_member(group.id):
             raise DotsValidationError({"error": "You must be a member of this group to add expenses."})
         
-        if paid_by.group != group:
+        if paid_by.group_id != group.id:
             raise DotsValidationError({"error": "Paid by member must belong to this group."})
         
         if split_type == Expense.SplitType.ITEMIZED:
@@ -111,15 +117,15 @@ class ExpenseCreateSerializer(serializers.ModelSerializer):
                 raise DotsValidationError({"error": "At least one item is required for itemized split type."})
             
             assignee_ids = [i["assignee"] for i in items]
-            group_members = GroupMember.objects.filter(group=group, id__in=assignee_ids)
-            if group_members.count() != len(set(assignee_ids)):
+            group_members = membership_cache.get_members(group.id, assignee_ids)
+            if group_members is None:
                 raise DotsValidationError({"error": "All item assignees must belong to this group."})
 
             total_items_amount = sum([i["amount"] for i in items])
             if total_items_amount != attrs["amount"]:
                 raise DotsValidationError({"error": "Total itemized amount must match the main expense amount."})
 
-            attrs["_group_members"] = {gm.id: gm for gm in group_members}
+            attrs["_group_members"] = group_members
             return attrs
         
         if split_type in (Expense.SplitType.EQUAL, Expense.SplitType.PERCENTAGE):
@@ -127,9 +133,9 @@ class ExpenseCreateSerializer(serializers.ModelSerializer):
                 raise DotsValidationError({"error": "Splits are required for equal/percentage split types."})
             
             group_member_ids = [s["participant"] for s in splits]
-            group_members = GroupMember.objects.filter(group=group, id__in=group_member_ids)
+            group_members = membership_cache.get_members(group.id, group_member_ids)
             
-            if group_members.count() != len(set(group_member_ids)):
+            if group_members is None:
                 raise DotsValidationError({"error": "All members in splits must belong to this group."})
             
             included_splits = [s for s in splits if s["is_included"]]
@@ -153,7 +159,7 @@ class ExpenseCreateSerializer(serializers.ModelSerializer):
                     if total_percentage != Decimal("100"):
                         raise DotsValidationError({"error": "Total percentage must be equal to 100%."})
             
-            attrs["_group_members"] = {gm.id: gm for gm in group_members}
+            attrs["_group_members"] = group_members
         
         return attrs
     
@@ -165,56 +171,59 @@ class ExpenseCreateSerializer(serializers.ModelSerializer):
         validated_data["created_by"] = self.context["request"].user
         
         expense = Expense.objects.create(**validated_data)
+        if not get_membership_cache(self.context["request"]).lock_members(expense.group_id, [*group_members, expense.paid_by_id]):
+            raise DotsValidationError({"error": "A member of this expense has left the group."})
+        splits = []
 
         if expense.split_type == Expense.SplitType.ITEMIZED:
+            items = []
+            agg = {}
             for item in items_data:
                 assignee_id = item["assignee"]
-                ExpenseItem.objects.create(expense=expense, title=item["title"], amount=item["amount"], assignee=group_members[assignee_id])
-            
-            agg = {}
-            for it in items_data:
-                pid = it["assignee"]
-                agg.setdefault(pid, Decimal("0"))
-                agg[pid] += it["amount"]
+                items.append(ExpenseItem(expense=expense, title=item["title"], amount=item["amount"], assignee=group_members[assignee_id]))
+                agg[assignee_id] = agg.get(assignee_id, Decimal("0")) + item["amount"]
 
-            for pid, amt in agg.items():
-                ExpenseSplit.objects.create(expense=expense, participant=group_members[pid], amount=amt, is_included=True)
+            ExpenseItem.objects.bulk_create(items)
+            splits = [ExpenseSplit(expense=expense, participant=group_members[pid], amount=amt, is_included=True) for pid, amt in agg.items()]
 
         if expense.split_type in (Expense.SplitType.EQUAL, Expense.SplitType.PERCENTAGE):
             included_splits = [s for s in splits_data if s["is_included"]]
             
             if expense.split_type == Expense.SplitType.EQUAL:
-                split_amount = expense.amount / len(included_splits)
+                split_amount = (expense.amount / len(included_splits)).quantize(Decimal("0.01"))
                 for split_data in splits_data:
                     participant_id = split_data["participant"]
-                    ExpenseSplit.objects.create(
+                    splits.append(ExpenseSplit(
                         expense=expense,
                         participant=group_members[participant_id],
                         amount=split_amount if split_data["is_included"] else None,
                         is_included=split_data["is_included"]
-                    )
+                    ))
             
             elif expense.split_type == Expense.SplitType.PERCENTAGE:
                 for split_data in splits_data:
                     participant_id = split_data["participant"]
                     if split_data["is_included"]:
                         percentage = split_data["percentage"]
-                        amount = (expense.amount * percentage) / Decimal("100")
+                        amount = ((expense.amount * percentage) / Decimal("100")).quantize(Decimal("0.01"))
                     else:
                         percentage = None
                         amount = None
                     
-                    ExpenseSplit.objects.create(
+                    splits.append(ExpenseSplit(
                         expense=expense,
                         participant=group_members[participant_id],
                         amount=amount,
                         percentage=percentage,
                         is_included=split_data["is_included"]
-                    )
+                    ))
         
-        splits = expense.expense_splits.filter(is_included=True)
-        member_amount_map = {s.participant_id: s.amount.quantize(Decimal("0.01")) for s in splits}
-        create_expense_activity(expense=expense, member_amount_map=member_amount_map, triggered_by=self.context["request"].user)
+        ExpenseSplit.objects.bulk_create(splits)
+        member_amount_map = {s.participant_id: s.amount for s in splits if s.is_included}
+        apply_balance_deltas(expense.group_id, get_balance_deltas(expense.paid_by_id, member_amount_map))
+        apply_spending_deltas(get_spending_deltas(get_expense_day(expense), expense.category_id, member_amount_map, get_member_user_ids(list(member_amount_map), group_members)))
+        update_group_stats(expense.group_id, expenses_delta=expense.amount)
+        create_expense_activity(expense=expense, member_amount_map=member_amount_map, triggered_by=self.context["request"].user, group_members=group_members)
 
         return expense
 
@@ -258,13 +267,14 @@ class ExpenseUpdateSerializer(serializers.ModelSerializer):
         delete_items = attrs.get("delete_items", None)
 
         split_type_changed = old_split_type != split_type
+        membership_cache = get_membership_cache(request)
         
-        if not GroupMember.objects.filter(group=group, user=request.user).exists():
+        if not membership_cache.is_member(group.id):
             raise DotsValidationError({"error": "You must be a member of this group to update expenses."})
         
         if "paid_by" in attrs:
             paid_by = attrs["paid_by"]
-            if paid_by.group != group:
+            if paid_by.group_id != group.id:
                 raise DotsValidationError({"error": "Paid by member must belong to this group."})
         
         if split_type_changed:
@@ -295,9 +305,9 @@ class ExpenseUpdateSerializer(serializers.ModelSerializer):
                 seen_ids = set()
 
                 group_member_ids = [it["assignee"] for it in items]
-                group_members = {gm.id: gm for gm in GroupMember.objects.filter(group=group, id__in=group_member_ids)}
+                group_members = membership_cache.get_members(group.id, group_member_ids)
 
-                if len(group_members) != len(set(group_member_ids)):
+                if group_members is None:
                     raise DotsValidationError({"error": "All item assignees must belong to this group."})
 
                 attrs["_group_members"] = group_members
@@ -317,12 +327,13 @@ class ExpenseUpdateSerializer(serializers.ModelSerializer):
                 update_items = []
                 create_items = []
             
+            update_items_by_id = {raw["id"]: raw for raw in update_items}
             total = Decimal("0")
             for eid, itm in existing_items.items():
                 if eid in delete_ids:
                     continue
                 
-                updated = next((raw for raw in update_items if raw.get("id") == eid), None)
+                updated = update_items_by_id.get(eid)
                 if updated:
                     amt = updated.get("amount")
                     if amt is None:
@@ -351,6 +362,7 @@ class ExpenseUpdateSerializer(serializers.ModelSerializer):
                 raise DotsValidationError({"error": f"Total of items ({total}) does not equal expense amount ({amount})."})
             
             attrs["_items_ops"] = {
+                "existing_items": existing_items,
                 "delete_ids": delete_ids,
                 "update_items": update_items,
                 "create_items": create_items,
@@ -362,9 +374,9 @@ class ExpenseUpdateSerializer(serializers.ModelSerializer):
             splits = attrs["splits"]
             
             group_member_ids = [s["participant"] for s in splits]
-            group_members = GroupMember.objects.filter(group=group, id__in=group_member_ids)
+            group_members = membership_cache.get_members(group.id, group_member_ids)
             
-            if group_members.count() != len(set(group_member_ids)):
+            if group_members is None:
                 raise DotsValidationError({"error": "All members in splits must belong to this group."})
             
             included_splits = [s for s in splits if s["is_included"]]
@@ -388,7 +400,7 @@ class ExpenseUpdateSerializer(serializers.ModelSerializer):
                     if total_percentage != Decimal("100"):
                         raise DotsValidationError({"error": "Total percentage must be equal to 100%."})
             
-            attrs["_group_members"] = {gm.id: gm for gm in group_members}
+            attrs["_group_members"] = group_members
         
         return attrs
     
@@ -396,8 +408,14 @@ class ExpenseUpdateSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         splits_data = validated_data.pop("splits", None)
         items_ops = validated_data.pop("_items_ops", None)
+        group_members = validated_data.pop("_group_members", {})
+        if group_members and not get_membership_cache(self.context["request"]).lock_members(instance.group_id, group_members):
+            raise DotsValidationError({"error": "A member of this expense has left the group."})
         old_splits = {s.participant_id: (s.amount or None) for s in instance.expense_splits.all()}
+        old_paid_by_id = instance.paid_by_id
+        old_category_id = instance.category_id
         validated_data.pop("items", None)
+        validated_data.pop("delete_items", None)
 
         old_amount = instance.amount
         old_split_type = instance.split_type
@@ -411,11 +429,15 @@ class ExpenseUpdateSerializer(serializers.ModelSerializer):
         if split_type_changed:
             ExpenseSplit.objects.filter(expense=instance).delete()
             ExpenseItem.objects.filter(expense=instance).delete()
-            instance.refresh_from_db()
+            existing_splits = {}
+        else:
+            existing_splits = {s.participant_id: s for s in instance.expense_splits.all()}
 
-        existing_splits = {s.participant_id: s for s in instance.expense_splits.all()}
+        splits_to_update = []
+        splits_to_create = []
 
         if instance.split_type == Expense.SplitType.ITEMIZED and items_ops is not None:
+            existing_items = {} if split_type_changed else items_ops["existing_items"]
             delete_ids = items_ops["delete_ids"]
             update_items = items_ops["update_items"]
             create_items = items_ops["create_items"]
@@ -424,46 +446,27 @@ class ExpenseUpdateSerializer(serializers.ModelSerializer):
                 ExpenseItem.objects.filter(id__in=delete_ids, expense=instance).delete()
             
             items_to_update = []
-            if update_items:
-                ids_to_update = [raw["id"] for raw in update_items]
-                existing_map = {itm.id: itm for itm in ExpenseItem.objects.filter(id__in=ids_to_update, expense=instance)}
-                for raw in update_items:
-                    itm = existing_map[raw["id"]]
-                    itm.title = raw["title"]
-                    itm.amount = Decimal(str(raw["amount"]))
-                    assignee_id = raw["assignee"]
-                    if assignee_id != itm.assignee_id:
-                        try:
-                            gm = GroupMember.objects.get(id=assignee_id, group=instance.group)
-                        except GroupMember.DoesNotExist:
-                            raise DotsValidationError({"error": f"Assignee {assignee_id} does not belong to this expense's group."})
-                        itm.assignee = gm
-                    items_to_update.append(itm)
-                if items_to_update:
-                    ExpenseItem.objects.bulk_update(items_to_update, ["title", "amount", "assignee"])
+            for raw in update_items:
+                itm = existing_items[raw["id"]]
+                itm.title = raw["title"]
+                itm.amount = Decimal(str(raw["amount"]))
+                itm.assignee = group_members[raw["assignee"]]
+                items_to_update.append(itm)
+            if items_to_update:
+                ExpenseItem.objects.bulk_update(items_to_update, ["title", "amount", "assignee"])
             
-            if create_items:
-                assignee_ids = list({raw["assignee"] for raw in create_items})
-                gm_map = {gm.id: gm for gm in GroupMember.objects.filter(group=instance.group, id__in=assignee_ids)}
-                to_create = []
-                for raw in create_items:
-                    assignee = gm_map.get(raw["assignee"])
-                    if assignee is None:
-                        raise DotsValidationError({"error": f"Assignee {raw['assignee']} does not belong to this expense's group."})
-                    to_create.append(ExpenseItem(
-                        expense=instance,
-                        title=raw["title"],
-                        amount=Decimal(str(raw["amount"])),
-                        assignee=assignee
-                    ))
-                if to_create:
-                    ExpenseItem.objects.bulk_create(to_create)
+            to_create = [
+                ExpenseItem(expense=instance, title=raw["title"], amount=Decimal(str(raw["amount"])), assignee=group_members[raw["assignee"]])
+                for raw in create_items
+            ]
+            if to_create:
+                ExpenseItem.objects.bulk_create(to_create)
             
-            agg_qs = ExpenseItem.objects.filter(expense=instance).values("assignee").annotate(total=Sum("amount"))
-            aggregated = {row["assignee"]: Decimal(row["total"] or 0) for row in agg_qs}
+            aggregated = {}
+            remaining_items = [itm for iid, itm in existing_items.items() if iid not in delete_ids] + to_create
+            for itm in remaining_items:
+                aggregated[itm.assignee_id] = aggregated.get(itm.assignee_id, Decimal("0")) + itm.amount
 
-            splits_to_update = []
-            splits_to_create = []
             for participant_id, amt in aggregated.items():
                 if participant_id in existing_splits:
                     s = existing_splits[participant_id]
@@ -486,11 +489,6 @@ class ExpenseUpdateSerializer(serializers.ModelSerializer):
                     s.is_included = False
                     s.percentage = None
                     splits_to_update.append(s)
-
-            if splits_to_update:
-                ExpenseSplit.objects.bulk_update(splits_to_update, ["amount", "is_included", "percentage"])
-            if splits_to_create:
-                ExpenseSplit.objects.bulk_create(splits_to_create)
             
         if instance.split_type in (Expense.SplitType.EQUAL, Expense.SplitType.PERCENTAGE):
             if splits_data:
@@ -507,47 +505,57 @@ class ExpenseUpdateSerializer(serializers.ModelSerializer):
 
                         if "amount" in data:
                             split.amount = data["amount"]
-
-                        split.save()
                     else:
-                        ExpenseSplit.objects.create(
+                        splits_to_create.append(ExpenseSplit(
                             expense=instance,
                             participant_id=participant_id,
                             is_included=data.get("is_included", True),
                             percentage=data.get("percentage"),
                             amount=data.get("amount"),
-                        )
+                        ))
 
             amount_changed = ("amount" in validated_data and validated_data["amount"] != old_amount)
-            split_type_changed = ("split_type" in validated_data and validated_data["split_type"] != old_split_type)
             splits_provided = splits_data is not None
 
             must_recalculate = amount_changed or split_type_changed or splits_provided
 
             if must_recalculate:
-                instance.refresh_from_db()
-                all_splits_qs = instance.expense_splits.all()
-                included_splits = [s for s in all_splits_qs if s.is_included]
+                all_splits = list(existing_splits.values()) + splits_to_create
+                included_splits = [s for s in all_splits if s.is_included]
 
                 if instance.split_type == Expense.SplitType.EQUAL:
-                    per_participant = (instance.amount / len(included_splits)) if included_splits else Decimal("0")
-                    for s in all_splits_qs:
+                    per_participant = (instance.amount / len(included_splits)).quantize(Decimal("0.01")) if included_splits else Decimal("0")
+                    for s in all_splits:
                         s.amount = per_participant if s.is_included else None
                         s.percentage = None
-                        s.save()
 
                 elif instance.split_type == Expense.SplitType.PERCENTAGE:
-                    for s in all_splits_qs:
+                    for s in all_splits:
                         if s.is_included and s.percentage:
-                            s.amount = (instance.amount * s.percentage) / Decimal("100")
+                            s.amount = ((instance.amount * s.percentage) / Decimal("100")).quantize(Decimal("0.01"))
                         else:
                             s.amount = None
                             s.percentage = None
-                        s.save()
 
-        new_splits = {s.participant_id: (s.amount.quantize(Decimal("0.01")) if s.amount is not None else None) for s in instance.expense_splits.all()}
+                splits_to_update = list(existing_splits.values())
+
+        if splits_to_update:
+            ExpenseSplit.objects.bulk_update(splits_to_update, ["amount", "is_included", "percentage"])
+        if splits_to_create:
+            ExpenseSplit.objects.bulk_create(splits_to_create)
+
+        instance._prefetched_objects_cache = {}
+
+        new_splits = {s.participant_id: (s.amount.quantize(Decimal("0.01")) if s.amount is not None else None) for s in list(existing_splits.values()) + splits_to_create}
         changed_members = {}
 
+        balance_deltas = merge_balance_deltas(get_balance_deltas(old_paid_by_id, old_splits, sign=-1), get_balance_deltas(instance.paid_by_id, new_splits))
+        apply_balance_deltas(instance.group_id, balance_deltas)
+        day = get_expense_day(instance)
+        user_ids = get_member_user_ids(list(old_splits.keys() | new_splits.keys()), group_members)
+        apply_spending_deltas(merge_balance_deltas(get_spending_deltas(day, old_category_id, old_splits, user_ids, sign=-1), get_spending_deltas(day, instance.category_id, new_splits, user_ids)))
+        update_group_stats(instance.group_id, expenses_delta=instance.amount - old_amount)
+
         for pid, new_amount in new_splits.items():
             old_amount = old_splits.get(pid)
 
@@ -558,6 +566,6 @@ class ExpenseUpdateSerializer(serializers.ModelSerializer):
                 changed_members[pid] = new_amount
 
         if changed_members:
-            create_expense_activity(expense=instance, member_amount_map=changed_members, triggered_by=self.context["request"].user, is_update=True)
+            schedule_expense_update_activity(expense=instance, member_amount_map=changed_members, triggered_by=self.context["request"].user, group_members=group_members)
 
         return instance
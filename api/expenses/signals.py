@@ -1,12 +1,41 @@
 from django.dispatch import receiver
-from django.db.models.signals import pre_delete
+from django.db.models.signals import pre_delete, post_delete
 from django.contrib.contenttypes.models import ContentType
 
-from api.expenses.models import Expense
+from api.groups.models import GroupMember
+from api.expenses.models import Expense, ExpenseSplit
 from api.activities.models import Activity
 
+from api.expenses.utils import get_balance_deltas, apply_balance_deltas, get_expense_day, get_spending_deltas, apply_spending_deltas, rebuild_daily_spending
+from api.groups.utils import update_group_stats
+
 
 @receiver(pre_delete, sender=Expense)
 def nullify_expense_activities(sender, instance, **kwargs):
     expense_ct = ContentType.objects.get_for_model(Expense)
     Activity.objects.filter(target_content_type=expense_ct, target_object_id=instance.id).update(target_content_type=None, target_object_id=None)
+
+
+@receiver(pre_delete, sender=Expense)
+def revert_expense_balances(sender, instance, **kwargs):
+    member_amount_map = dict(ExpenseSplit.objects.filter(expense=instance, is_included=True).values_list("participant_id", "amount"))
+    apply_balance_deltas(instance.group_id, get_balance_deltas(instance.paid_by_id, member_amount_map, sign=-1))
+
+
+@receiver(pre_delete, sender=Expense)
+def revert_expense_daily_spending(sender, instance, **kwargs):
+    rows = ExpenseSplit.objects.filter(expense=instance, is_included=True, amount__isnull=False).values_list("participant_id", "participant__user_id", "amount")
+    member_amount_map = {gm_id: amount for gm_id, _, amount in rows}
+    user_ids = {gm_id: user_id for gm_id, user_id, _ in rows}
+    apply_spending_deltas(get_spending_deltas(get_expense_day(instance), instance.category_id, member_amount_map, user_ids, sign=-1))
+
+
+@receiver(pre_delete, sender=Expense)
+def revert_expense_group_stats(sender, instance, **kwargs):
+    update_group_stats(instance.group_id, expenses_delta=-instance.amount)
+
+
+@receiver(post_delete, sender=GroupMember)
+def rebuild_member_daily_spending(sender, instance, **kwargs):
+    # The member's splits are cascade-deleted without signals, so recompute their rollups from what is left.
+    rebuild_daily_spending([instance.user_id])
@@ -0,0 +1,22 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+
+from api.jobs.utils import job
+
+from api.expenses.models import Expense
+from api.expenses.utils import create_expense_activity
+
+
+User = get_user_model()
+
+
+@job("expenses.update_activity")
+def send_expense_update_activity(expense_id, sender_id, shares):
+    expense = Expense.objects.select_related("group").filter(id=expense_id).first()
+    sender = User.objects.filter(id=sender_id).first()
+    if expense is None or sender is None:
+        return
+
+    member_amount_map = {int(gm_id): Decimal(amount) for gm_id, amount in shares.items()}
+    create_expense_activity(expense=expense, member_amount_map=member_amount_map, triggered_by=sender, is_update=True)
@@ -1,3 +1,268 @@
-from django.test import TestCase
+from io import StringIO
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.db import connection, IntegrityError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.core.management import call_command
+
+from api.core.membership import get_membership_cache
+from api.core.testing import create_group, create_user, get_client, get_expense_payload, reset_query_caches
+from api.jobs.utils import claim_jobs, run_job
+from api.groups.models import GroupBalance, GroupMember
+from api.groups.utils import rebuild_group_stats
+from api.jobs.models import Job
+from api.activities.models import Activity
+from api.categories.models import Category
+from api.expenses.models import Expense, ExpenseItem, ExpenseSplit, DailySpending
+from api.expenses.serializers import ExpenseCreateSerializer
+from api.expenses.utils import apply_balance_deltas, apply_spending_deltas, rebuild_daily_spending
+
+
+class GroupBalanceLedgerTests(TestCase):
+
+    def setUp(self):
+        self.group, self.members = create_group(3)
+
+    def get_balances(self):
+        return dict(GroupBalance.objects.filter(group=self.group).values_list("member_id", "balance"))
+
+    def test_apply_balance_deltas_creates_missing_rows_and_increments_existing(self):
+        first, second, third = self.members
+        apply_balance_deltas(self.group.id, {first.id: Decimal("10.00"), second.id: Decimal("-10.00")})
+        apply_balance_deltas(self.group.id, {first.id: Decimal("5.00"), third.id: Decimal("-5.00")})
+
+        self.assertEqual(self.get_balances(), {first.id: Decimal("15.00"), second.id: Decimal("-10.00"), third.id: Decimal("-5.00")})
+
+    def test_expense_writes_keep_balances_netted_to_zero(self):
+        client = get_client(self.group.created_by)
+        response = client.post("/api/expenses", get_expense_payload(self.group, self.members, amount="100.00"), format="json")
+        self.assertEqual(response.status_code, 201)
+        client.patch(f"/api/expenses/{response.json()['data']['id']}", {"amount": "40.00"}, format="json")
+
+        balances = self.get_balances()
+        self.assertEqual(sum(balances.values()), Decimal("0"))
+        self.assertEqual(balances[self.members[0].id], Decimal("26.66"))
+
+
+class ItemizedReceiptTests(TestCase):
+
+    def setUp(self):
+        reset_query_caches()
+        self.group, self.members = create_group(10)
+        self.client = get_client(self.group.created_by)
+
+    def get_split_totals(self, expense_id):
+        return dict(ExpenseSplit.objects.filter(expense_id=expense_id, is_included=True).values_list("participant_id", "amount"))
+
+    def get_item_totals(self, items):
+        totals = {}
+        for item in items:
+            totals[item["assignee"]] = totals.get(item["assignee"], Decimal("0")) + Decimal(item["amount"])
+        return totals
+
+    def test_create_and_update_500_item_receipt(self):
+        items = [{"title": f"Line {i}", "amount": f"{i % 9 + 1}.25", "assignee": self.members[i % len(self.members)].id} for i in range(500)]
+        payload = get_expense_payload(self.group, self.members, amount=str(sum(Decimal(item["amount"]) for item in items)), split_type="itemized", items=items)
+        payload.pop("splits")
+
+        with self.assertNumQueries(33):
+            response = self.client.post("/api/expenses", payload, format="json")
+        self.assertEqual(response.status_code, 201)
+        expense_id = response.json()["data"]["id"]
+        self.assertEqual(self.get_split_totals(expense_id), self.get_item_totals(items))
+
+        item_ids = list(ExpenseItem.objects.filter(expense_id=expense_id).order_by("id").values_list("id", flat=True))
+        updated_items = [{"id": item_id, "title": f"Line {i}", "amount": f"{i % 5 + 2}.50", "assignee": self.members[(i + 3) % len(self.members)].id} for i, item_id in enumerate(item_ids)]
+        with self.assertNumQueries(35):
+            response = self.client.patch(f"/api/expenses/{expense_id}", {"amount": str(sum(Decimal(item["amount"]) for item in updated_items)), "items": updated_items}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_split_totals(expense_id), self.get_item_totals(updated_items))
+
+
+class ExpenseFanOutTests(TestCase):
+
+    def setUp(self):
+        reset_query_caches()
+
+    def test_expense_create_in_100_member_group(self):
+        group, members = create_group(100)
+        client = get_client(group.created_by)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(28):
+                response = client.post("/api/expenses", get_expense_payload(group, members, amount="500.00"), format="json")
+        self.assertEqual(response.status_code, 201)
+
+        self.assertEqual(Activity.objects.filter(type=Activity.Types.EXPENSE_CREATE).count(), 100)
+        push_jobs = list(Job.objects.filter(name="activities.push"))
+        self.assertEqual(len(push_jobs), 1)
+        self.assertEqual(len(push_jobs[0].payload["notifications"]), 100)
+
+
+class ExpenseQueryCountTests(TestCase):
+
+    def setUp(self):
+        reset_query_caches()
+        self.group, self.members = create_group(10)
+        self.client = get_client(self.group.created_by)
+
+    def test_expense_list_queries_do_not_grow_with_expenses(self):
+        for count in (1, 10):
+            with self.subTest(expenses=count):
+                for _ in range(count):
+                    self.client.post("/api/expenses", get_expense_payload(self.group, self.members), format="json")
+                with self.assertNumQueries(6):
+                    response = self.client.get("/api/expenses?perPage=50")
+                self.assertEqual(response.status_code, 200)
+
+    def test_expense_patch(self):
+        expense_id = self.client.post("/api/expenses", get_expense_payload(self.group, self.members), format="json").json()["data"]["id"]
+        with self.assertNumQueries(26):
+            response = self.client.patch(f"/api/expenses/{expense_id}", {"amount": "45.00", "title": "Late dinner"}, format="json")
+        self.assertEqual(response.status_code, 200)
+
+
+
+
+class ExpenseMembershipTests(TestCase):
+
+    def setUp(self):
+        self.group, self.members = create_group(3)
+        self.client = get_client(self.group.created_by)
+        # Members are removed below, and create_group skips the signals that count them in.
+        rebuild_group_stats([self.group])
+
+    def post_expense(self, members):
+        return self.client.post("/api/expenses", get_expense_payload(self.group, members), format="json")
+
+    def test_splits_referencing_a_non_member_are_rejected(self):
+        _, other_members = create_group(2)
+        response = self.post_expense(self.members + other_members[1:])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("All members in splits must belong to this group.", str(response.json()))
+        self.assertFalse(Expense.objects.exists())
+
+    def test_member_removed_after_validation_is_rejected(self):
+        leaving = self.members[2]
+        validate = ExpenseCreateSerializer.validate
+
+        def validate_then_remove_member(serializer, attrs):
+            attrs = validate(serializer, attrs)
+            GroupMember.objects.filter(id=leaving.id).delete()
+            return attrs
+
+        with mock.patch.object(ExpenseCreateSerializer, "validate", validate_then_remove_member):
+            response = self.post_expense(self.members)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("has left the group", str(response.json()))
+        self.assertFalse(Expense.objects.exists())
+        self.assertFalse(ExpenseSplit.objects.exists())
+
+    def test_memberships_are_cached_per_request(self):
+        owner = self.group.created_by
+        request = SimpleNamespace(user=owner)
+        cache = get_membership_cache(request)
+        self.assertTrue(cache.is_member(self.group.id))
+        cache.get_group_members(self.group.id)
+
+        GroupMember.objects.filter(id=self.members[2].id).delete()
+        self.assertIs(get_membership_cache(request), cache)
+        self.assertIn(self.members[2].id, cache.get_group_members(self.group.id))
+
+        self.assertNotIn(self.members[2].id, get_membership_cache(SimpleNamespace(user=owner)).get_group_members(self.group.id))
+        request.user = create_user()
+        self.assertFalse(get_membership_cache(request).is_member(self.group.id))
+        self.assertEqual(self.post_expense(self.members).status_code, 400)
+
+
+class ExpenseUpdateCoalescingTests(TestCase):
+
+    def setUp(self):
+        self.group, self.members = create_group(3)
+        self.client = get_client(self.group.created_by)
+        self.expense_id = self.client.post("/api/expenses", get_expense_payload(self.group, self.members), format="json").json()["data"]["id"]
+
+    def patch(self, amount):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f"/api/expenses/{self.expense_id}", {"amount": amount}, format="json")
+        self.assertEqual(response.status_code, 200)
+
+    def run_due_jobs(self):
+        Job.objects.filter(status=Job.Status.PENDING).update(run_at=timezone.now())
+        return [run_job(job_obj) for job_obj in claim_jobs(10)]
+
+    def get_update_shares(self):
+        return sorted((activity.receiver_id, activity.params["amount"]) for activity in Activity.objects.filter(type=Activity.Types.EXPENSE_UPDATE))
+
+    def test_edits_inside_the_window_send_one_activity_with_the_latest_share(self):
+        for amount in ("45.00", "60.00", "90.00"):
+            self.patch(amount)
+
+        self.assertEqual(Job.objects.filter(name="expenses.update_activity").count(), 1)
+        self.assertEqual(self.get_update_shares(), [])
+        self.assertEqual(self.run_due_jobs(), [True])
+        self.assertEqual(self.get_update_shares(), sorted((member.user_id, "30.00") for member in self.members))
+
+    def test_edit_after_the_job_ran_schedules_a_new_one(self):
+        self.patch("45.00")
+        self.run_due_jobs()
+        self.patch("60.00")
+
+        self.assertEqual(list(Job.objects.filter(name="expenses.update_activity").order_by("id").values_list("status", flat=True)), [Job.Status.DONE, Job.Status.PENDING])
+        self.run_due_jobs()
+        self.assertEqual(self.get_update_shares(), sorted([(member.user_id, "15.00") for member in self.members] + [(member.user_id, "20.00") for member in self.members]))
+
+    @override_settings(EXPENSE_UPDATE_COALESCE_WINDOW=0)
+    def test_zero_window_sends_activities_immediately(self):
+        self.patch("45.00")
+
+        self.assertFalse(Job.objects.filter(name="expenses.update_activity").exists())
+        self.assertEqual(self.get_update_shares(), sorted((member.user_id, "15.00") for member in self.members))
+
+
+class DailySpendingTests(TestCase):
+
+    def setUp(self):
+        self.group, self.members = create_group(3)
+        self.user = self.group.created_by
+        self.today = timezone.localdate()
+
+    def check_drift(self):
+        out = StringIO()
+        call_command("check_daily_spending", stdout=out)
+        return out.getvalue()
+
+    def test_uncategorised_deltas_share_one_row(self):
+        apply_spending_deltas({(self.user.id, self.today, None): Decimal("10.00")})
+        apply_spending_deltas({(self.user.id, self.today, None): Decimal("-2.50")})
+
+        self.assertEqual(list(DailySpending.objects.filter(user=self.user).values_list("category_id", "amount")), [(None, Decimal("7.50"))])
+        with self.assertRaises(IntegrityError):
+            DailySpending.objects.create(user=self.user, day=self.today, category=None, amount=Decimal("1.00"))
+
+    def test_unrounded_legacy_splits_do_not_report_drift(self):
+        response = get_client(self.user).post("/api/expenses", get_expense_payload(self.group, self.members, amount="10.00"), format="json")
+        self.assertEqual(response.status_code, 201)
+
+        # Rows written before splits were rounded hold more than two decimal places; Django would round them on save.
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE expenses_expensesplit SET amount = '3.3333333333333' WHERE expense_id = %s", [response.json()["data"]["id"]])
+        rebuild_daily_spending([member.user_id for member in self.members])
+
+        self.assertIn("Found drift for 0 users.", self.check_drift())
+
+    def test_deleting_a_category_folds_its_spending_into_uncategorised(self):
+        category = Category.objects.create(name="Groceries")
+        client = get_client(self.user)
+        for payload in (get_expense_payload(self.group, self.members, amount="30.00"), get_expense_payload(self.group, self.members, amount="12.00", category=category.id)):
+            self.assertEqual(client.post("/api/expenses", payload, format="json").status_code, 201)
+
+        category.delete()
+
+        self.assertEqual(list(DailySpending.objects.filter(user=self.user).values_list("category_id", "amount")), [(None, Decimal("14.00"))])
+        self.assertIn("Found drift for 0 users.", self.check_drift())
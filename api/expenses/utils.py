@@ -1,24 +1,181 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.db.models import F, Sum, Case, When, Value, DecimalField
+from django.db.models.functions import TruncDate
+
 from api.activities.models import Activity
+from api.activities.messages import MessageKeys
+from api.groups.models import GroupMember, GroupBalance
+from api.expenses.models import ExpenseSplit, DailySpending
 
+from api.jobs.utils import coalesce
+from api.users.utils import invalidate_dashboard_cache
 from api.activities.services import notification_service
 
 
-def create_expense_activity(expense, member_amount_map, triggered_by, is_update=False):
+CENTS = Decimal("0.01")
+
+
+def get_member_user_ids(member_ids, group_members=None):
+    # Reuse GroupMember rows the caller already loaded; anything missing is fetched in a single query.
+    group_members = group_members or {}
+    user_ids = {gm_id: group_members[gm_id].user_id for gm_id in member_ids if gm_id in group_members}
+    missing_ids = [gm_id for gm_id in member_ids if gm_id not in user_ids]
+    if missing_ids:
+        user_ids.update(GroupMember.objects.filter(id__in=missing_ids).values_list("id", "user_id"))
+    return user_ids
+
+
+def create_expense_activity(expense, member_amount_map, triggered_by, is_update=False, group_members=None):
     activity_list = []
+    user_ids = get_member_user_ids(list(member_amount_map), group_members)
 
-    for gm_id, amount in member_amount_map.items():
-        gm = expense.group.members.get(id=gm_id)
+    if is_update:
+        activity_type, message_key = Activity.Types.EXPENSE_UPDATE, MessageKeys.EXPENSE_UPDATE
+    else:
+        activity_type, message_key = Activity.Types.EXPENSE_CREATE, MessageKeys.EXPENSE_CREATE
 
-        if is_update:
-            title = "Expense Updated"
-            content = f"Expense updated by {triggered_by.fullname if triggered_by != gm.user else 'you'} in the group '{expense.group.name}', '{expense.title}'. Your share has changed to ${amount}."
-            activity_type = Activity.Types.EXPENSE_UPDATE
-        else:
-            title = "New Expense Added"
-            content = f"New expense added by {triggered_by.fullname if triggered_by != gm.user else 'you'} in the group '{expense.group.name}', '{expense.title}'. Your share is ${amount}."
-            activity_type = Activity.Types.EXPENSE_CREATE
+    for gm_id, amount in member_amount_map.items():
+        receiver_id = user_ids.get(gm_id)
+        if receiver_id is None:
+            continue
 
-        activity_list.append(Activity(sender=triggered_by, receiver=gm.user, type=activity_type, title=title, content=content, target=expense))
+        params = {"group_id": expense.group_id, "expense_id": expense.id, "amount": str(amount)}
+        activity_list.append(Activity(sender=triggered_by, receiver_id=receiver_id, type=activity_type, message_key=message_key, params=params, target=expense))
 
     # Activity.objects.bulk_create(activity_list)
     notification_service.bulk_create(activity_list, create_activity=True)
+
+
+def merge_expense_update_payloads(pending, incoming):
+    return {**incoming, "shares": {**pending["shares"], **incoming["shares"]}}
+
+
+def schedule_expense_update_activity(expense, member_amount_map, triggered_by, group_members=None):
+    # Edits inside the window fold into one pending job per expense, so each receiver gets a single activity and push with their latest share.
+    window = settings.EXPENSE_UPDATE_COALESCE_WINDOW
+    if window <= 0:
+        create_expense_activity(expense=expense, member_amount_map=member_amount_map, triggered_by=triggered_by, is_update=True, group_members=group_members)
+        return
+
+    shares = {str(gm_id): str(amount) for gm_id, amount in member_amount_map.items()}
+    coalesce("expenses.update_activity", key=f"expense:{expense.id}", delay=window, merge=merge_expense_update_payloads, expense_id=expense.id, sender_id=triggered_by.id, shares=shares)
+
+
+def get_balance_deltas(paid_by_id, member_amount_map, sign=1):
+    # The payer is credited with the sum of the stored (rounded) shares so a group's balances always net to zero.
+    deltas = {}
+
+    for gm_id, amount in member_amount_map.items():
+        if amount is None:
+            continue
+        deltas[gm_id] = deltas.get(gm_id, Decimal("0")) - sign * amount
+        deltas[paid_by_id] = deltas.get(paid_by_id, Decimal("0")) + sign * amount
+
+    return deltas
+
+
+def merge_balance_deltas(*deltas_list):
+    merged = {}
+
+    for deltas in deltas_list:
+        for gm_id, amount in deltas.items():
+            merged[gm_id] = merged.get(gm_id, Decimal("0")) + amount
+
+    return {gm_id: amount for gm_id, amount in merged.items() if amount}
+
+
+def apply_balance_deltas(group_id, deltas):
+    if not deltas:
+        return
+
+    # Increment in the database so concurrent expense writes on the same group can't overwrite each other's deltas;
+    # missing rows are inserted first and a concurrent insert of the same (group, member) is simply ignored.
+    GroupBalance.objects.bulk_create([GroupBalance(group_id=group_id, member_id=gm_id, balance=0) for gm_id in deltas], ignore_conflicts=True)
+
+    delta = Case(*[When(member_id=gm_id, then=Value(amount)) for gm_id, amount in deltas.items()], output_field=DecimalField(max_digits=12, decimal_places=2))
+    GroupBalance.objects.filter(group_id=group_id, member_id__in=deltas.keys()).update(balance=F("balance") + delta)
+
+
+def rebuild_group_balances(group):
+    splits = ExpenseSplit.objects.filter(expense__group=group, is_included=True, amount__isnull=False)
+    paid = splits.values("expense__paid_by_id").annotate(total=Sum("amount"))
+    owed = splits.values("participant_id").annotate(total=Sum("amount"))
+
+    balances = {}
+    for row in paid:
+        balances[row["expense__paid_by_id"]] = balances.get(row["expense__paid_by_id"], Decimal("0")) + row["total"]
+    for row in owed:
+        balances[row["participant_id"]] = balances.get(row["participant_id"], Decimal("0")) - row["total"]
+
+    GroupBalance.objects.filter(group=group).delete()
+    GroupBalance.objects.bulk_create([GroupBalance(group=group, member_id=gm_id, balance=amount) for gm_id, amount in balances.items()])
+
+
+def get_expense_day(expense):
+    return timezone.localdate(expense.created_at)
+
+
+def get_spending_deltas(day, category_id, member_amount_map, user_ids, sign=1):
+    deltas = {}
+
+    for gm_id, amount in member_amount_map.items():
+        if amount is None or gm_id not in user_ids:
+            continue
+        key = (user_ids[gm_id], day, category_id)
+        deltas[key] = deltas.get(key, Decimal("0")) + sign * amount
+
+    return deltas
+
+
+def apply_spending_deltas(deltas):
+    if not deltas:
+        return
+
+    invalidate_dashboard_cache(user_id for user_id, _, _ in deltas)
+
+    # Same approach as the balance ledger: insert missing rows (the unique constraints turn a concurrent insert of the
+    # same key into a no-op), then lock them and apply every delta as one amount = amount + CASE ... increment.
+    with transaction.atomic():
+        DailySpending.objects.bulk_create([DailySpending(user_id=user_id, day=day, category_id=category_id, amount=0) for user_id, day, category_id in deltas], ignore_conflicts=True)
+
+        user_ids = {user_id for user_id, _, _ in deltas}
+        days = {day for _, day, _ in deltas}
+        rows = DailySpending.objects.select_for_update().filter(user_id__in=user_ids, day__in=days).values_list("id", "user_id", "day", "category_id")
+        row_ids = {(user_id, day, category_id): row_id for row_id, user_id, day, category_id in rows}
+
+        delta = Case(*[When(id=row_ids[key], then=Value(amount)) for key, amount in deltas.items()], output_field=DecimalField(max_digits=12, decimal_places=2))
+        DailySpending.objects.filter(id__in=[row_ids[key] for key in deltas]).update(amount=F("amount") + delta)
+
+
+def get_live_daily_spending(user_ids=None):
+    splits = ExpenseSplit.objects.filter(is_included=True, amount__isnull=False)
+    if user_ids is not None:
+        splits = splits.filter(participant__user_id__in=user_ids)
+
+    # Legacy splits can hold unrounded amounts and SQLite doesn't quantize SUM, so round to what a rollup row can store.
+    rows = splits.annotate(day=TruncDate("expense__created_at")).values("participant__user_id", "day", "expense__category_id").annotate(total=Sum("amount"))
+    return {(row["participant__user_id"], row["day"], row["expense__category_id"]): row["total"].quantize(CENTS) for row in rows}
+
+
+def get_stored_daily_spending(user_ids=None):
+    rows = DailySpending.objects.all()
+    if user_ids is not None:
+        rows = rows.filter(user_id__in=user_ids)
+
+    stored = {}
+    for user_id, day, category_id, amount in rows.values_list("user_id", "day", "category_id", "amount"):
+        key = (user_id, day, category_id)
+        stored[key] = stored.get(key, Decimal("0")) + amount
+    return {key: amount.quantize(CENTS) for key, amount in stored.items()}
+
+
+def rebuild_daily_spending(user_ids):
+    invalidate_dashboard_cache(user_ids)
+    live = get_live_daily_spending(user_ids)
+    DailySpending.objects.filter(user_id__in=user_ids).delete()
+    DailySpending.objects.bulk_create([DailySpending(user_id=user_id, day=day, category_id=category_id, amount=amount) for (user_id, day, category_id), amount in live.items()], batch_size=1000)
+
@@ -1,3 +1,6 @@
+from django.db.models import prefetch_related_objects
+
+from rest_framework import filters
 from rest_framework.permissions import IsAuthenticated
 
 from django_filters.rest_framework import DjangoFilterBackend
@@ -5,8 +8,10 @@ from django_filters.rest_framework import DjangoFilterBackend
 from api.core.filters import ExpenseFilter
 from api.core.mixin import DotsModelViewSet
 from api.core.permissions import IsOwner
+from api.core.querysets import filter_by_membership
 
 from api.expenses.models import Expense
+from api.expenses.documents import ExpenseDocument
 
 from api.expenses.serializers import ExpenseSerializer, ExpenseCreateSerializer, ExpenseUpdateSerializer
 
@@ -14,17 +19,33 @@ from api.expenses.serializers import ExpenseSerializer, ExpenseCreateSerializer,
 class ExpenseViewSet(DotsModelViewSet):
     serializer_class = ExpenseSerializer
     serializer_create_class = ExpenseCreateSerializer
-    queryset = Expense.objects.all().select_related("group", "paid_by__user", "category", "created_by").prefetch_related("expense_splits__participant__user").order_by("-created_at")
+    queryset = Expense.objects.all().select_related("group", "paid_by__user", "created_by").prefetch_related("expense_splits__participant__user", "items__assignee__user").order_by("-created_at")
     permission_classes = [IsAuthenticated, IsOwner]
-    filter_backends = [DjangoFilterBackend]
+    filter_backends = [filters.SearchFilter, DjangoFilterBackend]
     filterset_class = ExpenseFilter
+    document = ExpenseDocument
+    # Used by SearchFilter when the document store isn't available.
+    search_fields = ["title", "notes"]
     action_serializers = {
         "partial_update": ExpenseUpdateSerializer,
     }
     
     def get_queryset(self):
         queryset = super().get_queryset()
-        return queryset.filter(group__members__user=self.request.user).distinct()
+        return filter_by_membership(queryset, self.request.user)
+    
+    def get_search_queryset(self, search_value):
+        return ["multi_match"], {"query": search_value}
+
+    def perform_create(self, serializer):
+        expense = serializer.save()
+        prefetch_related_objects([expense], "expense_splits__participant__user", "items__assignee__user")
+        return expense
+    
+    def perform_update(self, serializer):
+        # The mixin drops the instance's prefetch cache after saving, so serialize a freshly prefetched copy.
+        expense = serializer.save()
+        return self.get_queryset().get(pk=expense.pk)
     
     def get_serializer_create_class(self):
         if self.action in self.action_serializers:
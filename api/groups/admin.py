@@ -1,7 +1,9 @@
 from django.contrib import admin
 
-from api.groups.models import Group, GroupMember
+from api.groups.models import Group, GroupMember, GroupStats, GroupBalance
 
 
 admin.site.register(Group)
 admin.site.register(GroupMember)
+admin.site.register(GroupStats)
+admin.site.register(GroupBalance)
@@ -0,0 +1,15 @@
+from api.search.documents import Document, registry
+
+from api.groups.models import Group
+
+
+@registry.register_document
+class GroupDocument(Document):
+
+    class Index:
+        name = "groups"
+        weights = {"name": 10}
+
+    class Django:
+        model = Group
+        fields = ["name", "description"]
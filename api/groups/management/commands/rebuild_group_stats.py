@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from api.groups.models import Group
+from api.groups.utils import rebuild_group_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute GroupStats (member count, expense total, last activity) for every group."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        group_ids = list(Group.objects.order_by("id").values_list("id", flat=True))
+        rebuilt = 0
+
+        for start in range(0, len(group_ids), batch_size):
+            rebuilt += rebuild_group_stats(list(Group.objects.filter(id__in=group_ids[start:start + batch_size])))
+
+        self.stdout.write(f"Rebuilt stats for {rebuilt} groups.")
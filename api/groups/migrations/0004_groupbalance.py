@@ -0,0 +1,48 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:15
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def backfill_group_balances(apps, schema_editor):
+    ExpenseSplit = apps.get_model("expenses", "ExpenseSplit")
+    GroupBalance = apps.get_model("groups", "GroupBalance")
+
+    splits = ExpenseSplit.objects.filter(is_included=True, amount__isnull=False)
+    balances = {}
+    for row in splits.values("expense__group_id", "expense__paid_by_id").annotate(total=Sum("amount")):
+        key = (row["expense__group_id"], row["expense__paid_by_id"])
+        balances[key] = balances.get(key, Decimal("0")) + row["total"]
+    for row in splits.values("expense__group_id", "participant_id").annotate(total=Sum("amount")):
+        key = (row["expense__group_id"], row["participant_id"])
+        balances[key] = balances.get(key, Decimal("0")) - row["total"]
+
+    GroupBalance.objects.bulk_create([GroupBalance(group_id=group_id, member_id=member_id, balance=balance) for (group_id, member_id), balance in balances.items()], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('groups', '0003_rename_member_groupmember_user_and_more'),
+        ('expenses', '0003_expenseitem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('balance', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balances', to='groups.group')),
+                ('member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balances', to='groups.groupmember')),
+            ],
+            options={
+                'unique_together': {('group', 'member')},
+            },
+        ),
+        migrations.RunPython(backfill_group_balances, migrations.RunPython.noop),
+    ]
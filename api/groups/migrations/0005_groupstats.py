@@ -0,0 +1,55 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:25
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Sum, Max
+
+
+def backfill_group_stats(apps, schema_editor):
+    Group = apps.get_model("groups", "Group")
+    GroupMember = apps.get_model("groups", "GroupMember")
+    GroupStats = apps.get_model("groups", "GroupStats")
+    Expense = apps.get_model("expenses", "Expense")
+
+    totals = dict(Expense.objects.values("group_id").annotate(total=Sum("amount")).values_list("group_id", "total"))
+    last_expense_at = dict(Expense.objects.values("group_id").annotate(latest=Max("updated_at")).values_list("group_id", "latest"))
+    last_member_at = dict(GroupMember.objects.values("group_id").annotate(latest=Max("created_at")).values_list("group_id", "latest"))
+    members = {}
+    for group_id, user_id, created_by_id in GroupMember.objects.values_list("group_id", "user_id", "group__created_by_id"):
+        if user_id != created_by_id:
+            members[group_id] = members.get(group_id, 0) + 1
+
+    stats = []
+    for group in Group.objects.all():
+        last_activity_at = max(filter(None, [group.created_at, last_expense_at.get(group.id), last_member_at.get(group.id)]))
+        stats.append(GroupStats(group=group, members_count=members.get(group.id, 0), total_expenses=totals.get(group.id) or Decimal("0"), last_activity_at=last_activity_at))
+
+    GroupStats.objects.bulk_create(stats, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('groups', '0004_groupbalance'),
+        ('expenses', '0003_expenseitem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('members_count', models.PositiveIntegerField(default=0)),
+                ('total_expenses', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('last_activity_at', models.DateTimeField(blank=True, null=True)),
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='groups.group')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.RunPython(backfill_group_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+from api.core.operations import AddIndexSafely
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('groups', '0005_groupstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexSafely(
+            model_name='groupmember',
+            index=models.Index(fields=['user', 'group'], name='groups_grou_user_id_4df01d_idx'),
+        ),
+    ]
@@ -16,6 +16,9 @@ class Group(BaseModel):
     def __str__(self):
         return f"{self.name} -> {self.created_by}"
 
+    def get_message_params(self):
+        return {"group": self.name}
+
 
 class GroupMember(BaseModel):
     group = models.ForeignKey(Group, related_name="members", on_delete=models.CASCADE)
@@ -23,6 +26,29 @@ class GroupMember(BaseModel):
     
     class Meta:
         unique_together = ("group", "user")
+        indexes = [models.Index(fields=["user", "group"])]
     
     def __str__(self):
         return f"{self.user} in {self.group.name}"
+
+
+class GroupStats(BaseModel):
+    group = models.OneToOneField(Group, related_name="stats", on_delete=models.CASCADE)
+    members_count = models.PositiveIntegerField(default=0)
+    total_expenses = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    last_activity_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.group.name} stats"
+
+
+class GroupBalance(BaseModel):
+    group = models.ForeignKey(Group, related_name="balances", on_delete=models.CASCADE)
+    member = models.ForeignKey(GroupMember, related_name="balances", on_delete=models.CASCADE)
+    balance = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ("group", "member")
+
+    def __str__(self):
+        return f"{self.member} -> {self.balance}"
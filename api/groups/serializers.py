@@ -8,10 +8,12 @@ from api.core.utils import DotsValidationError
 from api.core.validators import validate_image
 
 from api.friends.models import Friend
-from api.groups.models import Group, GroupMember
+from api.groups.models import Group, GroupMember, GroupBalance
 
 from api.users.serializers import ShortUserSerializer, ImageSerializer
 
+from api.groups.utils import update_group_stats
+
 
 User = get_user_model()
 
@@ -26,13 +28,17 @@ class GroupSerializer(serializers.ModelSerializer):
         fields = ["id", "created_by", "name", "description", "thumbnail", "members_count", "total_expenses", "member_profile_pictures"]
     
     def get_members_count(self, obj):
-        return getattr(obj, "members_count_annotated", 0)
+        stats = getattr(obj, "stats", None)
+        return stats.members_count if stats else 0
 
     def get_total_expenses(self, obj):
-        return getattr(obj, "total_expenses_annotated", 0.0)
+        stats = getattr(obj, "stats", None)
+        return stats.total_expenses if stats else 0.0
     
     def get_member_profile_pictures(self, obj):
-        members = obj.members.exclude(user=obj.created_by)[:5]
+        members = getattr(obj, "preview_members", None)
+        if members is None:
+            members = obj.members.exclude(user_id=obj.created_by_id).select_related("user").order_by("id")[:5]
         users = [m.user for m in members]
         return ImageSerializer(users, many=True, context=self.context).data
 
@@ -62,6 +68,20 @@ class GroupMemberSerializer(serializers.ModelSerializer):
         fields = ["id", "group", "user", "created_at", "updated_at"]
 
 
+class GroupBalanceSerializer(serializers.ModelSerializer):
+    member = GroupMemberSerializer(read_only=True)
+
+    class Meta:
+        model = GroupBalance
+        fields = ["member", "balance"]
+
+
+class SettlementSerializer(serializers.Serializer):
+    from_member = GroupMemberSerializer(read_only=True)
+    to_member = GroupMemberSerializer(read_only=True)
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+
+
 class GroupMemberCreateSerializer(serializers.ModelSerializer):
     group = serializers.PrimaryKeyRelatedField(queryset=Group.objects.all(), required=True)
     user = serializers.PrimaryKeyRelatedField(queryset=User.objects.all().exclude(is_staff=True, is_superuser=True), required=True)
@@ -131,5 +151,7 @@ class GroupMemberBulkCreateSerializer(serializers.Serializer):
         group = validated_data["group"]
         user_ids = validated_data["valid_user_ids"]
         instances = [GroupMember(group=group, user_id=uid) for uid in user_ids]
-        return GroupMember.objects.bulk_create(instances)
+        members = GroupMember.objects.bulk_create(instances)
+        update_group_stats(group.id, members_delta=len(members))
+        return members
 
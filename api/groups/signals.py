@@ -1,16 +1,18 @@
 from django.dispatch import receiver
+from django.utils import timezone
 from django.db.models.signals import post_save, pre_delete
 from django.contrib.contenttypes.models import ContentType
 
-from api.groups.models import Group, GroupMember
+from api.groups.models import Group, GroupMember, GroupStats
 from api.expenses.models import Expense
 
-from api.groups.utils import create_group_member_activities
+from api.groups.utils import create_group_member_activities, update_group_stats
 from api.activities.models import Activity
 
 @receiver(post_save, sender=Group)
 def add_creator_as_member(sender, instance, created, **kwargs):
     if created:
+        GroupStats.objects.create(group=instance, last_activity_at=timezone.now())
         GroupMember.objects.create(group=instance, user=instance.created_by)
 
 
@@ -18,6 +20,7 @@ def add_creator_as_member(sender, instance, created, **kwargs):
 def create_group_member_activity(sender, instance, created, **kwargs):
     if created and instance.user_id != instance.group.created_by_id:
         create_group_member_activities([instance], instance.group.created_by)
+        update_group_stats(instance.group_id, members_delta=1)
 
 
 @receiver(pre_delete, sender=Group)
@@ -34,3 +37,9 @@ def nullify_group_member_activities(sender, instance, **kwargs):
 
     Activity.objects.filter(target_content_type=group_ct, target_object_id=instance.group_id, receiver_id=instance.user_id).update(target_content_type=None, target_object_id=None)
     Activity.objects.filter(target_content_type=expense_ct, target_object_id__in=expense_ids, receiver_id=instance.user_id).update(target_content_type=None, target_object_id=None)
+
+
+@receiver(pre_delete, sender=GroupMember)
+def decrement_group_members_count(sender, instance, **kwargs):
+    if instance.user_id != instance.group.created_by_id:
+        update_group_stats(instance.group_id, members_delta=-1)
@@ -1,3 +1,146 @@
+import time
+from decimal import Decimal
+
 from django.test import TestCase
 
-# Create your tests here.
+from api.core.testing import create_group, create_user, get_client, get_expense_payload, get_view_queryset, get_query_plan, get_full_scans, reset_query_caches, requires_sqlite_plans
+from api.groups.views import GroupViewSet, GroupMemberViewSet
+from api.expenses.views import ExpenseViewSet
+from api.friends.models import Friend
+from api.groups.models import GroupBalance, GroupMember, GroupStats
+from api.groups.utils import simplify_debts, rebuild_group_stats
+
+
+def seed_balances(group, members):
+    # Every other member owes the member before them, so half the group are creditors and half debtors.
+    balances = {}
+    for index, member in enumerate(members):
+        balances[member.id] = Decimal(index % 7 + 1) * (1 if index % 2 else -1)
+    if len(members) % 2:
+        balances[members[-1].id] = Decimal("0")
+    balances[members[0].id] -= sum(balances.values())
+    GroupBalance.objects.bulk_create([GroupBalance(group=group, member_id=member_id, balance=balance) for member_id, balance in balances.items()])
+    return balances
+
+
+class SettleUpTests(TestCase):
+
+    def setUp(self):
+        reset_query_caches()
+
+    def assert_settles(self, balances, payments):
+        remaining = dict(balances)
+        for from_id, to_id, amount in payments:
+            self.assertGreater(amount, 0)
+            remaining[from_id] += amount
+            remaining[to_id] -= amount
+        self.assertTrue(all(balance == 0 for balance in remaining.values()))
+        self.assertLess(len(payments), len([balance for balance in balances.values() if balance]))
+
+    def test_settle_up_at_10_100_1000_members(self):
+        for member_count in (10, 100, 1000):
+            with self.subTest(members=member_count):
+                group, members = create_group(member_count)
+                balances = seed_balances(group, members)
+
+                started = time.perf_counter()
+                payments = simplify_debts(balances)
+                self.assertLess(time.perf_counter() - started, 1)
+                self.assert_settles(balances, payments)
+
+                with self.assertNumQueries(4):
+                    response = get_client(group.created_by).get(f"/api/groups/{group.id}/settle-up")
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.json()["data"]), len(payments))
+
+
+class GroupListQueryTests(TestCase):
+
+    def setUp(self):
+        reset_query_caches()
+
+    def test_group_list_queries_do_not_grow_with_member_count(self):
+        owner = create_user()
+        client = get_client(owner)
+
+        for member_count in (3, 30, 300):
+            with self.subTest(members=member_count):
+                create_group(member_count, owner=owner)
+                with self.assertNumQueries(3):
+                    response = client.get("/api/groups")
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(all(len(group["member_profile_pictures"]) <= 5 for group in response.json()["data"]))
+                self.assertEqual(len(response.json()["data"][0]["member_profile_pictures"]), 5 if member_count > 5 else member_count - 1)
+
+
+
+class GroupStatsDriftTests(TestCase):
+
+    def setUp(self):
+        self.group, self.members = create_group(3)
+        self.owner = self.group.created_by
+        self.client = get_client(self.owner)
+        # create_group bulk inserts members without signals, so start from rebuilt stats.
+        rebuild_group_stats([self.group])
+
+    def get_stats(self):
+        return GroupStats.objects.values_list("members_count", "total_expenses", "last_activity_at").get(group=self.group)
+
+    def assert_matches_rebuild(self):
+        members_count, total_expenses, last_activity_at = self.get_stats()
+        rebuild_group_stats([self.group])
+        rebuilt_count, rebuilt_total, rebuilt_last_activity_at = self.get_stats()
+
+        self.assertEqual((members_count, total_expenses), (rebuilt_count, rebuilt_total))
+        # Incremental updates stamp every write, including deletes the rebuild can no longer see.
+        self.assertGreaterEqual(last_activity_at, rebuilt_last_activity_at)
+
+    def add_friends(self, count):
+        friends = [create_user(fullname=f"Friend {i}") for i in range(count)]
+        Friend.objects.bulk_create([Friend(created_by=self.owner, member=friend) for friend in friends])
+        return friends
+
+    def test_incremental_stats_match_a_rebuild(self):
+        single, *bulk = self.add_friends(3)
+        self.assertEqual(self.client.post("/api/group-members", {"group": self.group.id, "user": single.id}, format="json").status_code, 201)
+        self.assert_matches_rebuild()
+        self.assertEqual(self.client.post("/api/group-members/bulk-create", {"group": self.group.id, "user": [user.id for user in bulk]}, format="json").status_code, 201)
+        self.assert_matches_rebuild()
+        self.assertEqual(self.get_stats()[0], 5)
+
+        self.assertEqual(self.client.delete(f"/api/group-members/{self.members[2].id}").status_code, 204)
+        self.assert_matches_rebuild()
+
+        members = list(self.group.members.order_by("id"))
+        first = self.client.post("/api/expenses", get_expense_payload(self.group, members, amount="50.00"), format="json").json()["data"]["id"]
+        second = self.client.post("/api/expenses", get_expense_payload(self.group, members, amount="25.00"), format="json").json()["data"]["id"]
+        self.assert_matches_rebuild()
+
+        self.assertEqual(self.client.patch(f"/api/expenses/{first}", {"amount": "80.00"}, format="json").status_code, 200)
+        self.assert_matches_rebuild()
+        self.assertEqual(self.client.delete(f"/api/expenses/{second}").status_code, 204)
+        self.assert_matches_rebuild()
+        self.assertEqual(self.get_stats()[:2], (4, Decimal("80.00")))
+
+
+@requires_sqlite_plans
+class MembershipScopingPlanTests(TestCase):
+    membership_index = "groups_grou_user_id_4df01d_idx"
+
+    def test_scoped_lists_use_the_membership_index(self):
+        group, members = create_group(3)
+
+        for viewset_class in (ExpenseViewSet, GroupViewSet, GroupMemberViewSet):
+            with self.subTest(viewset=viewset_class.__name__):
+                queryset = get_view_queryset(viewset_class, members[1].user)
+                self.assertIn(f"COVERING INDEX {self.membership_index}", get_query_plan(queryset))
+                self.assertEqual(get_full_scans(queryset), [])
+                self.assertNotIn("DISTINCT", str(queryset.query))
+
+
+    def test_balance_reads_use_indexes(self):
+        group, members = create_group(3)
+
+        for queryset in (GroupBalance.objects.filter(group=group), GroupMember.objects.filter(group=group).select_related("user").order_by("id")):
+            with self.subTest(query=str(queryset.query)[:60]):
+                self.assertEqual(get_full_scans(queryset), [])
@@ -1,4 +1,12 @@
+import heapq
+from decimal import Decimal
+
+from django.db.models import F, Max, Sum, Count, Prefetch
+from django.utils import timezone
+
 from api.activities.models import Activity
+from api.activities.messages import MessageKeys
+from api.groups.models import GroupMember, GroupStats
 
 from api.activities.services import notification_service
 
@@ -14,12 +22,78 @@ def create_group_member_activities(members, sender_user):
             sender=sender_user,
             receiver=receiver_user,
             type=Activity.Types.GROUP_MEMBER_ADD,
-            title="Added in a New Group",
-            content=f"You have been added to the new group '{group.name}' "
-                    f"created by '{sender_user.fullname}': "
-                    f"check your split now!",
+            message_key=MessageKeys.GROUP_MEMBER_ADD,
+            params={"group_id": group.id},
             target=member.group
         ))
 
     # Activity.objects.bulk_create(activity_objects)
     notification_service.bulk_create(activity_objects, create_activity=True)
+
+
+def update_group_stats(group_id, members_delta=0, expenses_delta=0):
+    GroupStats.objects.filter(group_id=group_id).update(
+        members_count=F("members_count") + members_delta,
+        total_expenses=F("total_expenses") + expenses_delta,
+        last_activity_at=timezone.now(),
+        updated_at=timezone.now(),
+    )
+
+
+def rebuild_group_stats(groups):
+    from api.expenses.models import Expense
+
+    group_ids = [group.id for group in groups]
+    expenses = Expense.objects.filter(group_id__in=group_ids).values("group_id")
+    totals = dict(expenses.annotate(total=Sum("amount")).values_list("group_id", "total"))
+    last_expense_at = dict(expenses.annotate(latest=Max("updated_at")).values_list("group_id", "latest"))
+    last_member_at = dict(GroupMember.objects.filter(group_id__in=group_ids).values("group_id").annotate(latest=Max("created_at")).values_list("group_id", "latest"))
+    members_count = dict(GroupMember.objects.filter(group_id__in=group_ids).exclude(user_id=F("group__created_by_id")).values("group_id").annotate(count=Count("id")).values_list("group_id", "count"))
+
+    existing = {stats.group_id: stats for stats in GroupStats.objects.filter(group_id__in=group_ids)}
+    to_update = []
+    to_create = []
+
+    for group in groups:
+        stats = existing.get(group.id) or GroupStats(group=group)
+        stats.members_count = members_count.get(group.id, 0)
+        stats.total_expenses = totals.get(group.id) or Decimal("0")
+        stats.last_activity_at = max(filter(None, [group.created_at, last_expense_at.get(group.id), last_member_at.get(group.id)]))
+        (to_update if stats.pk else to_create).append(stats)
+
+    GroupStats.objects.bulk_update(to_update, ["members_count", "total_expenses", "last_activity_at"])
+    GroupStats.objects.bulk_create(to_create)
+    return len(to_update) + len(to_create)
+
+
+def get_member_preview_prefetch(limit=5):
+    # Sliced prefetches are resolved with a window function, so every group on the page gets its preview in one query.
+    queryset = GroupMember.objects.exclude(user_id=F("group__created_by_id")).select_related("user").order_by("id")[:limit]
+    return Prefetch("members", queryset=queryset, to_attr="preview_members")
+
+
+def simplify_debts(balances):
+    # Greedy min-cash-flow: repeatedly settle the largest debtor against the largest creditor.
+    creditors = []
+    debtors = []
+
+    for member_id, balance in balances.items():
+        cents = int((balance * 100).to_integral_value())
+        if cents > 0:
+            heapq.heappush(creditors, (-cents, member_id))
+        elif cents < 0:
+            heapq.heappush(debtors, (cents, member_id))
+
+    payments = []
+    while creditors and debtors:
+        credit, creditor_id = heapq.heappop(creditors)
+        debt, debtor_id = heapq.heappop(debtors)
+        amount = min(-credit, -debt)
+        payments.append((debtor_id, creditor_id, Decimal(amount) / 100))
+
+        if -credit > amount:
+            heapq.heappush(creditors, (credit + amount, creditor_id))
+        if -debt > amount:
+            heapq.heappush(debtors, (debt + amount, debtor_id))
+
+    return payments
@@ -1,7 +1,8 @@
+from decimal import Decimal
+
 from django.http import Http404
 from django.db import transaction
-from django.db.models import Sum, Count, Q, Value, DecimalField, OuterRef, Subquery, When, IntegerField, Case
-from django.db.models.functions import Coalesce
+from django.db.models import Q, Value, OuterRef, Subquery, When, IntegerField, Case
 from django.contrib.auth import get_user_model
 
 from rest_framework import status
@@ -15,16 +16,18 @@ from django_filters.rest_framework import DjangoFilterBackend
 from api.core.permissions import IsOwner
 from api.core.filters import GroupMemberFilter, UserFilter
 from api.core.mixin import DotsModelViewSet
+from api.core.querysets import filter_by_membership, get_user_group_ids
 from api.core.utils import DotsValidationError
 
 from api.friends.models import Friend
-from api.groups.models import Group, GroupMember
-from api.expenses.models import Expense
+from api.groups.models import Group, GroupMember, GroupBalance
+from api.groups.documents import GroupDocument
 
 from api.users.serializers import ShortUserSerializer
-from api.groups.serializers import GroupSerializer, GroupCreateSerializer, GroupMemberSerializer, GroupMemberCreateSerializer, GroupMemberBulkCreateSerializer
+from api.groups.serializers import GroupSerializer, GroupCreateSerializer, GroupMemberSerializer, GroupMemberCreateSerializer, GroupMemberBulkCreateSerializer, GroupBalanceSerializer, SettlementSerializer
 
-from api.groups.utils import create_group_member_activities
+from api.groups.utils import create_group_member_activities, simplify_debts, get_member_preview_prefetch
+from api.expenses.utils import rebuild_group_balances
 
 
 User = get_user_model()
@@ -35,17 +38,21 @@ class GroupViewSet(DotsModelViewSet):
     serializer_create_class = GroupCreateSerializer
     queryset = Group.objects.all()
     permission_classes = [IsAuthenticated, IsOwner]
+    document = GroupDocument
+    # Used by SearchFilter when the document store isn't available.
+    search_fields = ["name", "description"]
 
     def get_queryset(self):
-        expenses_sum_subquery = Expense.objects.filter(group=OuterRef("pk")).values("group").annotate(total=Sum("amount")).values("total")
-        members_count_subquery = GroupMember.objects.filter(group=OuterRef("pk")).exclude(user=OuterRef("created_by")).values("group").annotate(count=Count("pk")).values("count")
-        return super().get_queryset().filter(Q(created_by=self.request.user) | Q(members__user=self.request.user)).select_related("created_by").prefetch_related("members__user").annotate(members_count_annotated=Coalesce(Subquery(members_count_subquery, output_field=IntegerField()), 0), total_expenses_annotated=Coalesce(Subquery(expenses_sum_subquery, output_field=DecimalField()), Value(0, output_field=DecimalField()))).distinct().order_by("-id")
+        return super().get_queryset().filter(Q(created_by=self.request.user) | Q(id__in=get_user_group_ids(self.request.user))).select_related("created_by", "stats").prefetch_related(get_member_preview_prefetch()).order_by("-id")
 
     def get_object(self):
         try:
             return super().get_object()
         except Http404:
             raise Http404("Group not found.")
+
+    def get_search_queryset(self, search_value):
+        return ["multi_match"], {"query": search_value}
     
     @action(detail=True, methods=["GET"], url_path="non-member-friends", serializer_class=ShortUserSerializer)
     def non_member_friends(self, request, pk=None):
@@ -62,6 +69,26 @@ class GroupViewSet(DotsModelViewSet):
         serializer = self.get_serializer(page, many=True, context={"request": request})
         return self.get_paginated_response(serializer.data)
 
+    @action(detail=True, methods=["GET"], url_path="balances", serializer_class=GroupBalanceSerializer)
+    def balances(self, request, pk=None):
+        group = self.get_object()
+        balances = dict(GroupBalance.objects.filter(group=group).values_list("member_id", "balance"))
+        members = GroupMember.objects.filter(group=group).select_related("user").order_by("id")
+        rows = [GroupBalance(group=group, member=gm, balance=balances.get(gm.id, Decimal("0.00"))) for gm in members]
+        serializer = self.get_serializer(rows, many=True)
+        return Response({"data": serializer.data})
+
+    @action(detail=True, methods=["GET"], url_path="settle-up", serializer_class=SettlementSerializer)
+    def settle_up(self, request, pk=None):
+        group = self.get_object()
+        balances = dict(GroupBalance.objects.filter(group=group).exclude(balance=0).values_list("member_id", "balance"))
+        payments = simplify_debts(balances)
+        # One group-scoped query; in_bulk would split a large id list into several batches.
+        members = {gm.id: gm for gm in GroupMember.objects.filter(group=group).select_related("user")} if payments else {}
+        rows = [{"from_member": members[from_id], "to_member": members[to_id], "amount": amount} for from_id, to_id, amount in payments]
+        serializer = self.get_serializer(rows, many=True)
+        return Response({"data": serializer.data})
+
 
 class GroupMemberViewSet(DotsModelViewSet):
     serializer_class = GroupMemberSerializer
@@ -72,7 +99,7 @@ class GroupMemberViewSet(DotsModelViewSet):
     filterset_class = GroupMemberFilter
     
     def get_queryset(self):
-        queryset = super().get_queryset().filter(group__members__user=self.request.user).distinct()
+        queryset = filter_by_membership(super().get_queryset(), self.request.user)
         return queryset.annotate(is_request_user=Case(When(user=self.request.user, then=Value(0)), default=Value(1), output_field=IntegerField())).order_by("is_request_user", "-id")
     
     def get_object(self):
@@ -90,7 +117,9 @@ class GroupMemberViewSet(DotsModelViewSet):
         if instance.user == group.created_by:
             raise DotsValidationError({"error": "Cannot remove group creator from the group."})
         
-        instance.delete()
+        with transaction.atomic():
+            instance.delete()
+            rebuild_group_balances(group)
         return Response(status=status.HTTP_204_NO_CONTENT)
     
     @action(detail=False, methods=["POST"], url_path="bulk-create", serializer_class=GroupMemberSerializer)
@@ -0,0 +1,6 @@
+from django.contrib import admin
+
+from api.jobs.models import Job
+
+
+admin.site.register(Job)
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.jobs.utils import claim_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Process the currently due jobs and exit.")
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--sleep", type=float, default=1.0, help="Seconds to wait when the queue is empty.")
+
+    def handle(self, *args, **options):
+        while True:
+            jobs = claim_jobs(options["batch_size"])
+
+            for job_obj in jobs:
+                succeeded = run_job(job_obj)
+                self.stdout.write(f"{'done' if succeeded else 'failed'}: {job_obj.name} #{job_obj.id}")
+
+            if options["once"] and not jobs:
+                return
+            if not jobs:
+                time.sleep(options["sleep"])
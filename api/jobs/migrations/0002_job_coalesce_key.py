@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='coalesce_key',
+            field=models.CharField(blank=True, db_index=True, max_length=100, null=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+from django.db import models
+from django.utils import timezone
+
+from api.core.models import BaseModel, CharFieldSizes
+
+
+class Job(BaseModel):
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        RUNNING = "running"
+        DONE = "done"
+        FAILED = "failed"
+
+    name = models.CharField(max_length=CharFieldSizes.MEDIUM)
+    payload = models.JSONField(default=dict)
+    coalesce_key = models.CharField(max_length=CharFieldSizes.MEDIUM, null=True, blank=True, db_index=True)
+    status = models.CharField(max_length=CharFieldSizes.EXTRA_SMALL, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=CharFieldSizes.SMALL, null=True, blank=True)
+    last_error = models.TextField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "run_at"])]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
@@ -0,0 +1,133 @@
+from io import StringIO
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.core.management import call_command
+
+from api.jobs.models import Job
+from api.jobs.utils import registry, enqueue, coalesce, claim_jobs, run_job
+
+
+class CoalesceTests(TestCase):
+
+    def coalesce(self, merge, **payload):
+        with self.captureOnCommitCallbacks(execute=True):
+            coalesce("tests.coalesce", key="expense:1", delay=0, merge=merge, **payload)
+
+    def test_pending_job_absorbs_later_payloads(self):
+        self.coalesce(None, shares={"1": "10.00"})
+        self.coalesce(lambda pending, incoming: {"shares": {**pending["shares"], **incoming["shares"]}}, shares={"2": "5.00"})
+
+        self.assertEqual(list(Job.objects.values_list("payload", flat=True)), [{"shares": {"1": "10.00", "2": "5.00"}}])
+
+    def test_job_claimed_while_merging_gets_a_successor(self):
+        def merge_while_a_worker_claims(pending, incoming):
+            claim_jobs(10)
+            return {**pending, **incoming}
+
+        self.coalesce(None, shares={"1": "10.00"})
+        self.coalesce(merge_while_a_worker_claims, shares={"1": "12.00"})
+
+        jobs = list(Job.objects.order_by("id").values_list("status", "payload"))
+        self.assertEqual(jobs, [(Job.Status.RUNNING, {"shares": {"1": "10.00"}}), (Job.Status.PENDING, {"shares": {"1": "12.00"}})])
+
+
+@override_settings(JOBS_MAX_ATTEMPTS=3, JOBS_RETRY_DELAY=30, JOBS_LOCK_TIMEOUT=600)
+class JobQueueTests(TestCase):
+
+    def setUp(self):
+        self.calls = []
+        patcher = mock.patch.dict(registry, {"tests.record": self.record_job, "tests.fail": self.fail_job})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def record_job(self, **payload):
+        self.calls.append(payload)
+
+    def fail_job(self, **payload):
+        raise ValueError("boom")
+
+    def enqueue(self, name, run_at=None, **payload):
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue(name, run_at=run_at, **payload)
+        return Job.objects.latest("id")
+
+    def test_jobs_are_only_written_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            enqueue("tests.record")
+            self.assertFalse(Job.objects.exists())
+
+    def test_due_jobs_are_claimed_in_run_at_order(self):
+        now = timezone.now()
+        later = self.enqueue("tests.record", run_at=now - timedelta(seconds=10))
+        earlier = self.enqueue("tests.record", run_at=now - timedelta(seconds=20))
+        future = self.enqueue("tests.record", run_at=now + timedelta(minutes=5))
+
+        claimed = claim_jobs(10)
+
+        self.assertEqual([job_obj.id for job_obj in claimed], [earlier.id, later.id])
+        self.assertTrue(all(job_obj.status == Job.Status.RUNNING and job_obj.attempts == 1 for job_obj in claimed))
+        self.assertEqual(claim_jobs(10), [])
+        future.refresh_from_db()
+        self.assertEqual(future.status, Job.Status.PENDING)
+
+    def test_claim_respects_the_limit(self):
+        for _ in range(3):
+            self.enqueue("tests.record")
+
+        self.assertEqual(len(claim_jobs(2)), 2)
+        self.assertEqual(len(claim_jobs(2)), 1)
+
+    def test_failures_back_off_exponentially_then_fail(self):
+        job_obj = self.enqueue("tests.fail")
+
+        for attempt in (1, 2):
+            started = timezone.now()
+            self.assertFalse(run_job(claim_jobs(1)[0]))
+            job_obj.refresh_from_db()
+            self.assertEqual((job_obj.status, job_obj.attempts), (Job.Status.PENDING, attempt))
+            self.assertIn("ValueError: boom", job_obj.last_error)
+            self.assertAlmostEqual((job_obj.run_at - started).total_seconds(), 30 * 2 ** (attempt - 1), delta=5)
+            Job.objects.filter(id=job_obj.id).update(run_at=timezone.now())
+
+        with self.assertLogs("api.jobs.utils", "ERROR"):
+            self.assertFalse(run_job(claim_jobs(1)[0]))
+        job_obj.refresh_from_db()
+        self.assertEqual((job_obj.status, job_obj.attempts), (Job.Status.FAILED, 3))
+        self.assertEqual(claim_jobs(1), [])
+
+    def test_unknown_job_names_fail(self):
+        self.enqueue("tests.missing")
+
+        self.assertFalse(run_job(claim_jobs(1)[0]))
+        self.assertIn("No handler registered", Job.objects.get().last_error)
+
+    def test_stale_locks_are_released_until_attempts_run_out(self):
+        stale_at = timezone.now() - timedelta(seconds=601)
+        retryable = self.enqueue("tests.record", payload="retry")
+        exhausted = self.enqueue("tests.record", payload="exhausted")
+        fresh = self.enqueue("tests.record", payload="fresh")
+        Job.objects.filter(id=retryable.id).update(status=Job.Status.RUNNING, locked_by="dead", attempts=1, updated_at=stale_at)
+        Job.objects.filter(id=exhausted.id).update(status=Job.Status.RUNNING, locked_by="dead", attempts=3, updated_at=stale_at)
+        Job.objects.filter(id=fresh.id).update(status=Job.Status.RUNNING, locked_by="alive", attempts=1)
+
+        claimed = claim_jobs(10)
+
+        self.assertEqual([(job_obj.id, job_obj.attempts) for job_obj in claimed], [(retryable.id, 2)])
+        self.assertEqual(Job.objects.get(id=exhausted.id).status, Job.Status.FAILED)
+        self.assertEqual(Job.objects.get(id=fresh.id).locked_by, "alive")
+
+    def test_run_jobs_command_processes_due_jobs(self):
+        self.enqueue("tests.record", payload="first")
+        self.enqueue("tests.fail")
+        self.enqueue("tests.record", run_at=timezone.now() + timedelta(minutes=5), payload="later")
+
+        out = StringIO()
+        call_command("run_jobs", once=True, stdout=out)
+
+        self.assertEqual(self.calls, [{"payload": "first"}])
+        self.assertIn("done: tests.record", out.getvalue())
+        self.assertIn("failed: tests.fail", out.getvalue())
+        self.assertEqual(Job.objects.filter(status=Job.Status.DONE).count(), 1)
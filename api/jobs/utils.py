@@ -0,0 +1,86 @@
+import uuid
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from api.jobs.models import Job
+
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+
+def job(name):
+    def decorator(func):
+        registry[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, run_at=None, **payload):
+    # The row is written once the surrounding transaction commits, so workers never see jobs for rolled back work.
+    def create_job():
+        Job.objects.create(name=name, payload=payload, run_at=run_at or timezone.now(), max_attempts=settings.JOBS_MAX_ATTEMPTS)
+
+    transaction.on_commit(create_job)
+
+
+def coalesce(name, key, delay, merge, **payload):
+    # Folds the payload into a not-yet-claimed job with the same key; otherwise schedules a new one `delay` seconds out.
+    def upsert_job():
+        with transaction.atomic():
+            pending = Job.objects.select_for_update().filter(name=name, coalesce_key=key, status=Job.Status.PENDING).order_by("id").first()
+            # SQLite ignores select_for_update, so a worker may claim the job after the read; only merge while it is still pending.
+            if pending is not None and Job.objects.filter(pk=pending.pk, status=Job.Status.PENDING).update(payload=merge(pending.payload, payload), updated_at=timezone.now()):
+                return
+            Job.objects.create(name=name, coalesce_key=key, payload=payload, run_at=timezone.now() + timedelta(seconds=delay), max_attempts=settings.JOBS_MAX_ATTEMPTS)
+
+    transaction.on_commit(upsert_job)
+
+
+def claim_jobs(limit):
+    now = timezone.now()
+    worker_id = uuid.uuid4().hex
+
+    # A lock that outlives the timeout means the worker died mid-job; give up on jobs that keep killing their worker.
+    stale = Job.objects.filter(status=Job.Status.RUNNING, updated_at__lt=now - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT))
+    stale.filter(attempts__gte=F("max_attempts")).update(status=Job.Status.FAILED, locked_by=None, last_error="Worker lock expired on the final attempt.", updated_at=now)
+    stale.update(status=Job.Status.PENDING, locked_by=None)
+
+    due_ids = list(Job.objects.filter(status=Job.Status.PENDING, run_at__lte=now).order_by("run_at", "id").values_list("id", flat=True)[:limit])
+    if not due_ids:
+        return []
+
+    Job.objects.filter(id__in=due_ids, status=Job.Status.PENDING).update(status=Job.Status.RUNNING, locked_by=worker_id, attempts=F("attempts") + 1, updated_at=now)
+    return list(Job.objects.filter(locked_by=worker_id, status=Job.Status.RUNNING).order_by("run_at", "id"))
+
+
+def run_job(job_obj):
+    handler = registry.get(job_obj.name)
+
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job '{job_obj.name}'.")
+        handler(**job_obj.payload)
+    except Exception:
+        job_obj.last_error = traceback.format_exc()
+        if job_obj.attempts >= job_obj.max_attempts:
+            job_obj.status = Job.Status.FAILED
+            logger.error(f"Job {job_obj.id} ({job_obj.name}) failed permanently: {job_obj.last_error}")
+        else:
+            job_obj.status = Job.Status.PENDING
+            job_obj.run_at = timezone.now() + timedelta(seconds=settings.JOBS_RETRY_DELAY * 2 ** (job_obj.attempts - 1))
+        job_obj.locked_by = None
+        job_obj.save(update_fields=["status", "run_at", "locked_by", "last_error", "updated_at"])
+        return False
+
+    job_obj.status = Job.Status.DONE
+    job_obj.locked_by = None
+    job_obj.save(update_fields=["status", "locked_by", "updated_at"])
+    return True
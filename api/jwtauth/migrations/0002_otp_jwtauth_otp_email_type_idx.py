@@ -0,0 +1,22 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:36
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+from api.core.operations import AddIndexSafely
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('jwtauth', '0001_initial'),
+    ]
+
+    operations = [
+        AddIndexSafely(
+            model_name='otp',
+            index=models.Index(django.db.models.functions.text.Upper('email'), models.F('type'), name='jwtauth_otp_email_type_idx'),
+        ),
+    ]
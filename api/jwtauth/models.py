@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Upper
 from django.contrib.auth import get_user_model
 
 from api.core.models import BaseModel, CharFieldSizes
@@ -8,6 +10,13 @@ from api.core.otp_helper import get_otp_verified_token
 User = get_user_model()
 
 
+class OTPQuerySet(models.QuerySet):
+
+    def for_email(self, email):
+        # Compare UPPER(email) directly so the (UPPER(email), type) index serves the lookup; iexact compiles to LIKE on SQLite.
+        return self.alias(upper_email=Upper("email")).filter(upper_email=Upper(Value(email)))
+
+
 class OTP(BaseModel):
     
     class Type(models.TextChoices):
@@ -22,6 +31,12 @@ class OTP(BaseModel):
     used = models.BooleanField(default=False)
     timeout = models.DateTimeField()
 
+    objects = OTPQuerySet.as_manager()
+
+    class Meta:
+        # Serves OTP.objects.for_email(...).filter(type=...).
+        indexes = [models.Index(Upper("email"), "type", name="jwtauth_otp_email_type_idx")]
+
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
         if not self.verification_token:
@@ -43,7 +43,7 @@ class OTPSerializer(serializers.Serializer):
         
         timeout = timezone.now() + timedelta(seconds=300)
         new_otp = OTP.objects.create(code=get_random_otp(), email=email, type=otp_type, timeout=timeout)
-        OTP.objects.filter(email__iexact=email, type=otp_type).exclude(pk=new_otp.pk).delete()
+        OTP.objects.for_email(email).filter(type=otp_type).exclude(pk=new_otp.pk).delete()
         send_confirmation_code(new_otp=new_otp, otp_type=otp_type)
         return attrs
 
@@ -58,7 +58,7 @@ class VerifyOTPSerializer(serializers.Serializer):
         otp_code = attrs["otp_code"]
         otp_type = attrs["otp_type"]
 
-        user_otp = OTP.objects.filter(email__iexact=email, type=otp_type).order_by("-pk").first()
+        user_otp = OTP.objects.for_email(email).filter(type=otp_type).order_by("-pk").first()
         if not user_otp:
             raise DotsValidationError({"email": [f"OTP not found"]})
         if str(user_otp.code) != otp_code:
@@ -97,7 +97,7 @@ class UserCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({"verification_token": "This field is required"}) 
 
         try:
-            otp = OTP.objects.get(email__iexact=email, verification_token=verification_token, type=OTP.Type.CREATE)
+            otp = OTP.objects.for_email(email).get(verification_token=verification_token, type=OTP.Type.CREATE)
         except OTP.DoesNotExist:
             raise DotsValidationError({"message": ["No record found, regenerate token!"]})
         verify_otp(user_otp=otp)
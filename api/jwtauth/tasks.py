@@ -0,0 +1,16 @@
+from api.core.otp_helper import deliver_confirmation_code, deliver_report_email
+from api.jobs.utils import job
+
+from api.jwtauth.models import OTP
+
+
+@job("jwtauth.send_confirmation_code")
+def send_confirmation_code(otp_id, otp_type):
+    otp = OTP.objects.filter(id=otp_id).first()
+    if otp:
+        deliver_confirmation_code(otp, otp_type)
+
+
+@job("jwtauth.send_report_email")
+def send_report_email(data):
+    deliver_report_email(data)
@@ -1,3 +1,19 @@
+from datetime import timedelta
+
 from django.test import TestCase
+from django.utils import timezone
+
+from api.core.testing import get_query_plan, get_full_scans, requires_sqlite_plans
+from api.jwtauth.models import OTP
+
+
+@requires_sqlite_plans
+class QueryPlanTests(TestCase):
+
+    def test_otp_lookup_uses_the_email_type_index(self):
+        OTP.objects.create(code=123456, email="Jane.Doe@Example.com", type=OTP.Type.CREATE, timeout=timezone.now() + timedelta(minutes=5))
+        queryset = OTP.objects.for_email("jane.doe@example.COM").filter(type=OTP.Type.CREATE).order_by("-pk")
 
-# Create your tests here.
+        self.assertEqual(queryset.count(), 1)
+        self.assertIn("jwtauth_otp_email_type_idx", get_query_plan(queryset))
+        self.assertEqual(get_full_scans(queryset), [])
@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+from django.utils.module_loading import autodiscover_modules
+
+
+class SearchConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'api.search'
+
+    def ready(self):
+        from api.search.documents import init_app_documents
+
+        autodiscover_modules("documents")
+        post_migrate.connect(init_app_documents, dispatch_uid="search.init_app_documents")
@@ -0,0 +1,266 @@
+import re
+
+from django.db import connections, router
+from django.db.models.signals import post_save, post_delete
+
+
+def get_match_terms(value):
+    return re.findall(r"\w+", value or "")
+
+
+def get_match_expression(value, fields):
+    # Every word has to prefix-match within the given columns, e.g. `{title notes} : ("din"* AND "caf"*)`.
+    terms = get_match_terms(value)
+    if not terms:
+        return None
+    return "{%s} : (%s)" % (" ".join(fields), " AND ".join(f'"{term}"*' for term in terms))
+
+
+class SearchResponse(list):
+
+    def to_dict(self):
+        return [{"id": obj.pk, "score": obj.search_rank} for obj in self]
+
+
+class Search:
+    """
+    Query builder over a document's FTS5 table, scoped to the database queryset it was created from.
+    """
+
+    def __init__(self, document, queryset):
+        self.document = document
+        self.queryset = queryset
+        self.expressions = []
+        self.is_empty = False
+        self.window = slice(None)
+
+    def _clone(self):
+        search = Search(self.document, self.queryset)
+        search.expressions = list(self.expressions)
+        search.is_empty = self.is_empty
+        search.window = self.window
+        return search
+
+    def query(self, query_type="multi_match", query=None, fields=None, **field_values):
+        search = self._clone()
+
+        if query_type == "multi_match":
+            expression = get_match_expression(query, fields or self.document.get_fields())
+            if expression is None:
+                search.is_empty = search.is_empty or bool((query or "").strip())
+            else:
+                search.expressions.append(expression)
+        elif query_type == "match":
+            for field, value in field_values.items():
+                if field not in self.document.get_fields():
+                    # Fields that aren't indexed are plain database filters on the scoped queryset.
+                    search.queryset = search.queryset.filter(**{field: value})
+                    continue
+                expression = get_match_expression(value, [field])
+                if expression is None:
+                    search.is_empty = True
+                else:
+                    search.expressions.append(expression)
+        else:
+            raise ValueError(f"Unsupported query type: {query_type}")
+
+        return search
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            raise TypeError("Search only supports slicing.")
+        search = self._clone()
+        search.window = key
+        return search
+
+    def get_queryset(self):
+        if self.is_empty:
+            return self.queryset.none()
+        if not self.expressions:
+            return self.queryset
+
+        # Join the FTS table on rowid so the match, the view's scoping filters and the bm25 ordering all run in one query.
+        quote_name = connections[self.queryset.db].ops.quote_name
+        table = quote_name(self.document.get_table_name())
+        model_table = quote_name(self.document.get_model()._meta.db_table)
+        pk_column = quote_name(self.document.get_model()._meta.pk.column)
+        return self.queryset.extra(
+            tables=[self.document.get_table_name()],
+            where=[f"{table}.rowid = {model_table}.{pk_column}", f"{table} MATCH %s"],
+            params=[" AND ".join(f"({expression})" for expression in self.expressions)],
+            select={"search_rank": f"{table}.rank"},
+            order_by=["search_rank"],
+        )
+
+    def to_queryset(self):
+        return self.get_queryset()[self.window]
+
+    def count(self):
+        return self.get_queryset().count()
+
+    def execute(self):
+        return SearchResponse(self.to_queryset())
+
+
+class Document:
+    """
+    Full-text index of a model's text fields in an SQLite FTS5 table keyed by the model's primary key.
+
+    Subclasses set `Index.name` and `Django.model`/`Django.fields`; `Index.weights` boosts fields in the bm25 ranking and
+    a `prepare_<field>` classmethod overrides how a field's value is read.
+    """
+
+    class Index:
+        name = None
+        weights = {}
+
+    class Django:
+        model = None
+        fields = []
+
+    @classmethod
+    def get_model(cls):
+        return cls.Django.model
+
+    @classmethod
+    def get_fields(cls):
+        return list(cls.Django.fields)
+
+    @classmethod
+    def get_weights(cls):
+        weights = getattr(cls.Index, "weights", {})
+        return [float(weights.get(field, 1)) for field in cls.get_fields()]
+
+    @classmethod
+    def get_table_name(cls):
+        return f"search_{cls.Index.name}"
+
+    @classmethod
+    def get_database(cls):
+        return router.db_for_write(cls.get_model())
+
+    @classmethod
+    def is_available(cls, using=None):
+        return connections[using or cls.get_database()].vendor == "sqlite"
+
+    @classmethod
+    def exists(cls, using=None):
+        return cls.get_table_name() in connections[using or cls.get_database()].introspection.table_names()
+
+    @classmethod
+    def init(cls, using=None):
+        """Create the FTS table if it is missing and index the existing rows; returns whether it was created."""
+        using = using or cls.get_database()
+        if not cls.is_available(using) or cls.exists(using):
+            return False
+
+        quote_name = connections[using].ops.quote_name
+        table = quote_name(cls.get_table_name())
+        columns = ", ".join(quote_name(field) for field in cls.get_fields())
+        weights = ", ".join(str(weight) for weight in cls.get_weights())
+        with connections[using].cursor() as cursor:
+            cursor.execute(f"CREATE VIRTUAL TABLE {table} USING fts5({columns}, tokenize='unicode61 remove_diacritics 2', prefix='2 3')")
+            # Persist the field weights as the table's default `rank` function.
+            cursor.execute(f"INSERT INTO {table} ({table}, rank) VALUES ('rank', %s)", [f"bm25({weights})"])
+        cls.rebuild(using=using)
+        return True
+
+    @classmethod
+    def search(cls, queryset=None):
+        return Search(cls, queryset if queryset is not None else cls.get_model().objects.all())
+
+    @classmethod
+    def prepare(cls, instance):
+        values = []
+        for field in cls.get_fields():
+            prepare_field = getattr(cls, f"prepare_{field}", None)
+            values.append(prepare_field(instance) if prepare_field else getattr(instance, field) or "")
+        return values
+
+    @classmethod
+    def update(cls, instances, using=None):
+        using = using or cls.get_database()
+        rows = [(instance.pk, *cls.prepare(instance)) for instance in instances]
+        if not rows or not cls.is_available(using):
+            return
+
+        quote_name = connections[using].ops.quote_name
+        table = quote_name(cls.get_table_name())
+        columns = ", ".join(quote_name(field) for field in cls.get_fields())
+        placeholders = ", ".join(["%s"] * (len(cls.get_fields()) + 1))
+        with connections[using].cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {table} WHERE rowid = %s", [(row[0],) for row in rows])
+            cursor.executemany(f"INSERT INTO {table} (rowid, {columns}) VALUES ({placeholders})", rows)
+
+    @classmethod
+    def delete(cls, pks, using=None):
+        using = using or cls.get_database()
+        if not pks or not cls.is_available(using):
+            return
+
+        with connections[using].cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {connections[using].ops.quote_name(cls.get_table_name())} WHERE rowid = %s", [(pk,) for pk in pks])
+
+    @classmethod
+    def rebuild(cls, batch_size=1000, using=None):
+        using = using or cls.get_database()
+        if not cls.is_available(using):
+            return 0
+
+        with connections[using].cursor() as cursor:
+            cursor.execute(f"DELETE FROM {connections[using].ops.quote_name(cls.get_table_name())}")
+
+        queryset = cls.get_model()._default_manager.using(using).order_by("pk")
+        last_pk = None
+        indexed = 0
+
+        while True:
+            batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            instances = list(batch[:batch_size])
+            if not instances:
+                break
+            last_pk = instances[-1].pk
+
+            cls.update(instances, using=using)
+            indexed += len(instances)
+
+        return indexed
+
+    @classmethod
+    def handle_save(cls, sender, instance, update_fields=None, using=None, **kwargs):
+        # Saves that only touch unindexed columns (e.g. last_login) leave the document as it is.
+        if update_fields is not None and not set(cls.get_fields()) & set(update_fields):
+            return
+        cls.update([instance], using=using)
+
+    @classmethod
+    def handle_delete(cls, sender, instance, using=None, **kwargs):
+        cls.delete([instance.pk], using=using)
+
+
+class DocumentRegistry:
+
+    def __init__(self):
+        self._documents = {}
+
+    def register_document(self, document):
+        self._documents[document.Index.name] = document
+        post_save.connect(document.handle_save, sender=document.get_model(), weak=False, dispatch_uid=f"search.{document.Index.name}.save")
+        post_delete.connect(document.handle_delete, sender=document.get_model(), weak=False, dispatch_uid=f"search.{document.Index.name}.delete")
+        return document
+
+    def get_documents(self):
+        return list(self._documents.values())
+
+    def get_document(self, name):
+        return self._documents[name]
+
+
+registry = DocumentRegistry()
+
+
+def init_app_documents(sender, app_config, using, **kwargs):
+    # post_migrate fires once per app, so each app's documents are created (and backfilled) once its tables exist.
+    for document in registry.get_documents():
+        if document.get_model()._meta.app_label == app_config.label:
+            document.init(using=using)
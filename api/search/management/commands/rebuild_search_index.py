@@ -0,0 +1,30 @@
+from django.db import transaction
+from django.core.management.base import BaseCommand, CommandError
+
+from api.search.documents import registry
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search indexes from the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--document", action="append", dest="documents", help="Index name to rebuild; defaults to all of them.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            documents = [registry.get_document(name) for name in options["documents"]] if options["documents"] else registry.get_documents()
+        except KeyError as e:
+            raise CommandError(f"Unknown search index {e}.")
+
+        for document in documents:
+            if not document.is_available():
+                self.stdout.write(f"{document.Index.name}: skipped, full-text search needs SQLite.")
+                continue
+
+            with transaction.atomic():
+                if not document.init():
+                    indexed = document.rebuild(batch_size=options["batch_size"])
+                    self.stdout.write(f"{document.Index.name}: indexed {indexed} rows.")
+                else:
+                    self.stdout.write(f"{document.Index.name}: created.")
@@ -0,0 +1,138 @@
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.core.mixin import GenericDotsViewSet
+from api.core.testing import create_group, create_user, get_client, get_expense_payload, requires_sqlite_plans
+from api.groups.views import GroupViewSet
+from api.groups.documents import GroupDocument
+from api.expenses.models import Expense
+from api.expenses.documents import ExpenseDocument
+
+
+def get_document_ids(document, query):
+    return set(document.search().query(query=query).to_queryset().values_list("id", flat=True))
+
+
+class SearchTestCase(TestCase):
+
+    def setUp(self):
+        self.group, self.members = create_group(2)
+        self.user = self.group.created_by
+        self.client = get_client(self.user)
+
+    def add_group(self, name, description="", owner=None):
+        group, _ = create_group(1, owner=owner or self.user)
+        group.name, group.description = name, description
+        group.save()
+        return group
+
+    def add_expense(self, title, notes=None, group=None, members=None):
+        payload = get_expense_payload(group or self.group, members or self.members, title=title, notes=notes)
+        response = get_client((group or self.group).created_by).post("/api/expenses", payload, format="json")
+        self.assertEqual(response.status_code, 201)
+        return response.json()["data"]["id"]
+
+    def search(self, path, query):
+        response = self.client.get(path, {"search": query})
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in response.json()["data"]]
+
+
+@requires_sqlite_plans
+class DocumentSearchTests(SearchTestCase):
+
+    def test_group_search_ranks_name_matches_first_and_matches_prefixes(self):
+        described = self.add_group("Flatmates", "Bills from the Lisbon apartment")
+        named = self.add_group("Lisbon trip")
+        self.add_group("Porto weekend")
+
+        self.assertEqual(self.search("/api/groups", "lisbon"), [named.id, described.id])
+        self.assertEqual(self.search("/api/groups", "lis"), [named.id, described.id])
+        self.assertEqual(self.search("/api/groups", "lis tri"), [named.id])
+        self.assertEqual(self.search("/api/groups", "madrid"), [])
+
+    def test_expense_search_ranks_title_matches_first_and_matches_prefixes(self):
+        in_notes = self.add_expense("Groceries", notes="Snacks for the pizza night")
+        in_title = self.add_expense("Pizza night")
+        self.add_expense("Taxi")
+
+        self.assertEqual(self.search("/api/expenses", "pizza"), [in_title, in_notes])
+        self.assertEqual(self.search("/api/expenses", "piz nig"), [in_title, in_notes])
+        self.assertEqual(self.search("/api/expenses", "taxi pizza"), [])
+
+    def test_results_stay_scoped_to_the_users_groups(self):
+        stranger = create_user(fullname="Stranger")
+        other_group, other_members = create_group(2, owner=stranger)
+        other_group.name = "Pizza club"
+        other_group.save()
+        self.add_expense("Pizza", group=other_group, members=other_members)
+        own_expense = self.add_expense("Pizza")
+
+        self.assertEqual(self.search("/api/groups", "pizza"), [])
+        self.assertEqual(self.search("/api/expenses", "pizza"), [own_expense])
+
+    def test_saves_and_deletes_reindex_rows(self):
+        group = self.add_group("Lisbon trip")
+        expense_id = self.add_expense("Pizza", group=group, members=list(group.members.all()))
+
+        group.name = "Porto trip"
+        group.save()
+        self.assertEqual(get_document_ids(GroupDocument, "lisbon"), set())
+        self.assertEqual(get_document_ids(GroupDocument, "porto"), {group.id})
+
+        # Saves that don't touch an indexed field keep the current row.
+        group.thumbnail = "group_thumbnails/porto.png"
+        group.save(update_fields=["thumbnail"])
+        self.assertEqual(get_document_ids(GroupDocument, "porto"), {group.id})
+
+        group.delete()
+        self.assertEqual(get_document_ids(GroupDocument, "porto"), set())
+        self.assertFalse(Expense.objects.filter(id=expense_id).exists())
+        self.assertEqual(get_document_ids(ExpenseDocument, "pizza"), set())
+
+    def test_rebuild_restores_the_index(self):
+        group = self.add_group("Lisbon trip")
+        GroupDocument.delete([group.id])
+        self.assertEqual(get_document_ids(GroupDocument, "lisbon"), set())
+
+        GroupDocument.rebuild()
+        self.assertEqual(get_document_ids(GroupDocument, "lisbon"), {group.id})
+
+
+class FallbackSearchTests(SearchTestCase):
+
+    def test_search_uses_the_filter_backends_without_fts5(self):
+        group = self.add_group("Lisbon trip")
+        expense_id = self.add_expense("Pizza night")
+        self.add_expense("Taxi")
+
+        with mock.patch.object(GroupDocument, "is_available", return_value=False), mock.patch.object(ExpenseDocument, "is_available", return_value=False):
+            self.assertEqual(self.search("/api/groups", "lisbon"), [group.id])
+            self.assertEqual(self.search("/api/expenses", "pizza"), [expense_id])
+
+
+class DocumentHookTests(SearchTestCase):
+
+    def test_base_search_hook_keeps_its_default(self):
+        self.assertEqual(GenericDotsViewSet().get_search_queryset("lisbon"), ([], {}))
+
+    @requires_sqlite_plans
+    def test_pagination_response_serializes_through_the_document_hook(self):
+        group = self.add_group("Lisbon trip")
+
+        class SummaryGroupViewSet(GroupViewSet):
+            def get_serializer_document(self, documents):
+                return [{"id": obj.id, "rank": obj.search_rank} for obj in documents]
+
+        for viewset_class, expected in ((GroupViewSet, {"id": group.id, "name": "Lisbon trip"}), (SummaryGroupViewSet, {"id": group.id})):
+            with self.subTest(viewset=viewset_class.__name__):
+                view = viewset_class(action="list", format_kwarg=None)
+                view.request = Request(APIRequestFactory().get("/api/groups", {"search": "lisbon"}))
+                view.request.user = self.user
+                response = view.get_pagination_response(GroupDocument.search(view.get_queryset()).query(query="lisbon"))
+
+                self.assertEqual(response["pagination"]["count"], 1)
+                self.assertLessEqual(expected.items(), response["data"][0].items())
@@ -1,11 +1,10 @@
-import requests
 from django.contrib.auth import get_user_model
-from django.core.files.base import ContentFile
 
 from allauth.socialaccount.models import SocialAccount
 from allauth.socialaccount.adapter import DefaultSocialAccountAdapter
 
 from api.core.utils import DotsValidationError
+from api.jobs.utils import enqueue
 
 
 User = get_user_model()
@@ -34,9 +33,7 @@ class CustomSocialAdapter(DefaultSocialAccountAdapter):
             profile_picture = None
             profile_picture = extract_picture_url(social_account.extra_data)
             if profile_picture:
-                response = requests.get(profile_picture)
-                if response.status_code == 200:
-                    user.profile_picture.save(f"{user.fullname}_picture.jpg", ContentFile(response.content), save=True)
+                enqueue("users.download_profile_picture", user_id=user.id, url=profile_picture)
         except Exception:
             raise DotsValidationError({"error": "Failed to save extra details."})
         
@@ -8,7 +8,7 @@ from api.groups.views import GroupViewSet, GroupMemberViewSet
 from api.categories.views import CategoryViewset
 from api.expenses.views import ExpenseViewSet
 from api.activities.views import ActivityViewset
-from api.users.views import DashboardStatisticsView, DashboardSpendingPatternView
+from api.users.views import DashboardStatisticsView, DashboardSpendingPatternView, DashboardTrendsView
 from fcm_django.api.rest_framework import FCMDeviceAuthorizedViewSet
 
 router = DefaultRouter(trailing_slash=False)
@@ -30,4 +30,5 @@ urlpatterns = [
     path("profile/image", UserProfileViewset.as_view({"patch": "user_image"}), name="user_image"),
     path("dashboard/statistics", DashboardStatisticsView.as_view(), name="dashboard_statistics"),
     path("dashboard/spending-patterns", DashboardSpendingPatternView.as_view(), name="dashboard_spending_patterns"),
+    path("dashboard/trends", DashboardTrendsView.as_view(), name="dashboard_trends"),
 ] + router.urls
@@ -7,3 +7,4 @@ class UsersConfig(AppConfig):
 
     def ready(self):
         import config.signals
+        import api.users.signals
@@ -0,0 +1,18 @@
+from django.contrib.auth import get_user_model
+
+from api.search.documents import Document, registry
+
+
+User = get_user_model()
+
+
+@registry.register_document
+class UserDocument(Document):
+
+    class Index:
+        name = "users"
+        weights = {"fullname": 10}
+
+    class Django:
+        model = User
+        fields = ["fullname", "email"]
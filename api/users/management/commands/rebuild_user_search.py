@@ -0,0 +1,32 @@
+from django.db import transaction
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from api.users.search import sync_user_search_terms
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Rebuild the UserSearchTerm index used for user typeahead search."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last_id = 0
+        indexed = 0
+
+        while True:
+            users = list(User.objects.filter(id__gt=last_id).order_by("id").only("id", "fullname", "email")[:batch_size])
+            if not users:
+                break
+            last_id = users[-1].id
+
+            with transaction.atomic():
+                sync_user_search_terms(users)
+            indexed += len(users)
+
+        self.stdout.write(f"Indexed {indexed} users.")
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:22
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_unread_activities_count(apps, schema_editor):
+    User = apps.get_model("users", "User")
+    Activity = apps.get_model("activities", "Activity")
+
+    unread = Activity.objects.filter(receiver=OuterRef("pk"), is_read=False).values("receiver").annotate(count=Count("id")).values("count")
+    User.objects.update(unread_activities_count=Coalesce(Subquery(unread), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+        ('activities', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='unread_activities_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_unread_activities_count, migrations.RunPython.noop),
+    ]
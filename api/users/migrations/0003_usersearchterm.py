@@ -0,0 +1,45 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:42
+
+import django.db.models.deletion
+from django.conf import settings
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+
+def normalize_terms(value):
+    value = unicodedata.normalize("NFKD", value or "").encode("ascii", "ignore").decode("ascii").lower()
+    return [term for term in re.split(r"[^a-z0-9]+", value) if term]
+
+
+def backfill_user_search_terms(apps, schema_editor):
+    User = apps.get_model("users", "User")
+    UserSearchTerm = apps.get_model("users", "UserSearchTerm")
+
+    terms = []
+    for user_id, fullname, email in User.objects.values_list("id", "fullname", "email").iterator(chunk_size=1000):
+        terms.extend(UserSearchTerm(user_id=user_id, term=term[:100]) for term in set(normalize_terms(fullname) + normalize_terms(email)))
+        if len(terms) >= 1000:
+            UserSearchTerm.objects.bulk_create(terms)
+            terms = []
+    UserSearchTerm.objects.bulk_create(terms)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_unread_activities_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(db_index=True, max_length=100)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(backfill_user_search_terms, migrations.RunPython.noop),
+    ]
@@ -37,6 +37,7 @@ class User(AbstractUser):
     profile_picture = models.ImageField(default="default.png", upload_to="profile_images")
     is_darkmode = models.BooleanField(default=False)
     is_cloud_sync = models.BooleanField(default=False)
+    unread_activities_count = models.PositiveIntegerField(default=0)
 
     username = None
 
@@ -56,3 +57,14 @@ class User(AbstractUser):
     def save(self, *args, **kwargs):
         self.full_clean()
         super().save(*args, **kwargs)
+
+
+class UserSearchTerm(models.Model):
+    """Normalized words of a user's name and email; prefix lookups on `term` are plain index range scans."""
+
+    user = models.ForeignKey(User, related_name="search_terms", on_delete=models.CASCADE)
+    term = models.CharField(max_length=CharFieldSizes.MEDIUM, db_index=True)
+
+    def __str__(self):
+        return f"{self.term} -> {self.user_id}"
+
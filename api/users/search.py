@@ -0,0 +1,62 @@
+import re
+import unicodedata
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from api.users.models import UserSearchTerm
+from api.users.documents import UserDocument
+
+
+def normalize_terms(value):
+    value = unicodedata.normalize("NFKD", value or "").encode("ascii", "ignore").decode("ascii").lower()
+    return [term for term in re.split(r"[^a-z0-9]+", value) if term]
+
+
+def get_user_terms(user):
+    return set(normalize_terms(user.fullname) + normalize_terms(user.email))
+
+
+def sync_user_search_terms(users):
+    users = list(users)
+    UserSearchTerm.objects.filter(user__in=users).delete()
+    UserSearchTerm.objects.bulk_create([UserSearchTerm(user=user, term=term[:UserSearchTerm._meta.get_field("term").max_length]) for user in users for term in get_user_terms(user)], batch_size=1000)
+
+
+def get_prefix_upper_bound(prefix):
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class ContainsUserSearchBackend:
+    """Substring match over the user table; no index can serve it, so keep it for small installs and debugging."""
+
+    def search(self, queryset, query):
+        return queryset.filter(Q(fullname__icontains=query) | Q(email__icontains=query))
+
+
+class PrefixUserSearchBackend:
+    """Every word of the query must prefix-match a word of the user's name or email."""
+
+    def search(self, queryset, query):
+        terms = normalize_terms(query)
+        if not terms:
+            return queryset.none() if query.strip() else queryset
+
+        for term in terms:
+            matching = UserSearchTerm.objects.filter(term__gte=term, term__lt=get_prefix_upper_bound(term)).values("user_id")
+            queryset = queryset.filter(id__in=matching)
+        return queryset
+
+
+class DocumentUserSearchBackend:
+    """Ranked full-text match through UserDocument; falls back to prefix terms where FTS5 isn't available."""
+
+    def search(self, queryset, query):
+        if not UserDocument.is_available(queryset.db):
+            return PrefixUserSearchBackend().search(queryset, query)
+        return UserDocument.search(queryset).query("multi_match", query=query).to_queryset()
+
+
+def get_user_search_backend():
+    return import_string(settings.USER_SEARCH_BACKEND)()
@@ -1,6 +1,9 @@
 from decimal import Decimal
+from datetime import time
 
-from django.db.models import Sum, Q
+from django.utils import timezone
+from django.db.models import Sum, Q, F, DateField
+from django.db.models.functions import TruncDay, TruncWeek, TruncMonth
 from django.contrib.auth import get_user_model
 
 from rest_framework import serializers
@@ -9,10 +12,11 @@ from allauth.socialaccount.models import SocialAccount
 
 from api.core.validators import validate_image
 
-from api.expenses.models import ExpenseSplit
-from api.categories.models import Category
+from api.expenses.models import ExpenseSplit, DailySpending
+from api.categories.utils import get_categories
 
-from api.users.utils import get_month_boundaries
+from api.core.helper import get_start_end_time
+from api.users.utils import get_month_boundaries, get_buckets, get_cached_dashboard
 
 
 User = get_user_model()
@@ -27,8 +31,7 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ["id", "email", "fullname", "profile_picture", "is_darkmode", "is_cloud_sync", "has_unread_activities", "is_social"]
     
     def get_has_unread_activities(self, obj):
-        has_unread = obj.received_notifications.all().filter(is_read=False).exists()
-        return True if has_unread else False
+        return obj.unread_activities_count > 0
     
     def get_is_social(self, obj):
         return SocialAccount.objects.filter(user=obj).exists()
@@ -56,7 +59,7 @@ class DashboardStatisticsSerializer(serializers.Serializer):
         month_start, today_end = get_month_boundaries(date)
         days_passed = (today_end.date() - month_start.date()).days + 1
         
-        total_expense = ExpenseSplit.objects.filter(Q(participant__user=user) & Q(is_included=True) & Q(expense__created_at__gte=month_start) & Q(expense__created_at__lte=today_end)).aggregate(total=Sum("amount"))["total"] or Decimal("0.00")
+        total_expense = DailySpending.objects.filter(user=user, day__gte=timezone.localdate(month_start), day__lte=timezone.localdate(today_end)).aggregate(total=Sum("amount"))["total"] or Decimal("0.00")
         daily_average = total_expense / Decimal(days_passed) if days_passed > 0 else Decimal("0.00")
         
         return {
@@ -70,7 +73,8 @@ class DashboardStatisticsSerializer(serializers.Serializer):
     def to_representation(self, instance):
         user = self.context.get("user")
         date = self.validated_data.get("date")
-        stats = self.calculate_statistics(user, date)
+        month_start, today_end = get_month_boundaries(date)
+        stats = get_cached_dashboard(user.id, "statistics", [month_start.date(), today_end.date()], lambda: self.calculate_statistics(user, date))
         
         return {
             "total_expense": str(stats["total_expense"]),
@@ -87,26 +91,37 @@ class DashboardSpendingPatternSerializer(serializers.Serializer):
     created_at__gte = serializers.DateTimeField(required=False)
     created_at__lte = serializers.DateTimeField(required=False)
 
-    def calculate_spending_by_category(self, user, date_gte=None, date_lte=None):
-        all_categories = Category.objects.all()
+    def get_spending_by_category(self, user, date_gte=None, date_lte=None):
+        # Whole-day ranges are answered from the DailySpending rollups; other bounds fall back to the raw splits.
+        is_start_of_day = date_gte is None or timezone.localtime(date_gte).time() == time.min
+        is_end_of_day = date_lte is None or timezone.localtime(date_lte).time() == time.max
+
+        if is_start_of_day and is_end_of_day:
+            rollups = DailySpending.objects.filter(user=user)
+            if date_gte:
+                rollups = rollups.filter(day__gte=timezone.localdate(date_gte))
+            if date_lte:
+                rollups = rollups.filter(day__lte=timezone.localdate(date_lte))
+            return {item["category_id"]: item["total_amount"] for item in rollups.values("category_id").annotate(total_amount=Sum("amount")).order_by()}
+
         filters = Q(participant__user=user) & Q(is_included=True)
-        
         if date_gte:
             filters &= Q(expense__created_at__gte=date_gte)
-        
         if date_lte:
             filters &= Q(expense__created_at__lte=date_lte)
-        
-        spending_by_category = ExpenseSplit.objects.filter(filters).values("expense__category__id").annotate(total_amount=Sum("amount"))
-        spending_dict = {item["expense__category__id"]: item["total_amount"] or Decimal("0.00") for item in spending_by_category}
-        uncategorized_spending = ExpenseSplit.objects.filter(filters & Q(expense__category__isnull=True)).aggregate(total=Sum("amount"))["total"] or Decimal("0.00")
+        return {item["expense__category_id"]: item["total_amount"] for item in ExpenseSplit.objects.filter(filters).values("expense__category_id").annotate(total_amount=Sum("amount")).order_by()}
+
+    def calculate_spending_by_category(self, user, date_gte=None, date_lte=None):
+        all_categories = get_categories()
+        spending_dict = {category_id: amount or Decimal("0.00") for category_id, amount in self.get_spending_by_category(user, date_gte, date_lte).items()}
+        uncategorized_spending = spending_dict.get(None, Decimal("0.00"))
         
         data = []
         total_spending = Decimal("0.00")
         
         for category in all_categories:
-            amount = spending_dict.get(category.id, Decimal("0.00"))
-            data.append({"label": category.name, "value": str(amount.quantize(Decimal("0.01")))})
+            amount = spending_dict.get(category["id"], Decimal("0.00"))
+            data.append({"label": category["name"], "value": str(amount.quantize(Decimal("0.01")))})
             total_spending += amount
         
         if uncategorized_spending > 0:
@@ -121,5 +136,58 @@ class DashboardSpendingPatternSerializer(serializers.Serializer):
         date_gte = self.validated_data.get("created_at__gte")
         date_lte = self.validated_data.get("created_at__lte")
         
-        result = self.calculate_spending_by_category(user, date_gte, date_lte)
+        parts = [date_gte.isoformat() if date_gte else "", date_lte.isoformat() if date_lte else ""]
+        result = get_cached_dashboard(user.id, "spending-patterns", parts, lambda: self.calculate_spending_by_category(user, date_gte, date_lte))
         return {"data": result["data"]}
+
+
+class DashboardTrendsSerializer(serializers.Serializer):
+    TRUNC_FUNCTIONS = {"day": TruncDay, "week": TruncWeek, "month": TruncMonth}
+
+    frequency = serializers.ChoiceField(choices=["day", "week", "month", "last_month"], default="month")
+    date = serializers.CharField(required=False, help_text="dd-mm-YYYY; defaults to today.")
+    bucket = serializers.ChoiceField(choices=["day", "week", "month"], default="day")
+    group_by = serializers.ChoiceField(choices=["category", "group"], required=False)
+
+    def get_rows(self, user, start_day, end_day, bucket, group_by):
+        trunc = self.TRUNC_FUNCTIONS[bucket]
+
+        # Spending per category lives in the DailySpending rollups; per-group totals need the raw splits.
+        if group_by == "group":
+            queryset = ExpenseSplit.objects.filter(participant__user=user, is_included=True, expense__created_at__date__gte=start_day, expense__created_at__date__lte=end_day)
+            return queryset.annotate(bucket=trunc("expense__created_at", output_field=DateField()), key=F("expense__group_id"), label=F("expense__group__name")).values("bucket", "key", "label").annotate(total=Sum("amount")).order_by("bucket", "key")
+
+        queryset = DailySpending.objects.filter(user=user, day__gte=start_day, day__lte=end_day)
+        if group_by == "category":
+            return queryset.annotate(bucket=trunc("day"), key=F("category_id"), label=F("category__name")).values("bucket", "key", "label").annotate(total=Sum("amount")).order_by("bucket", "key")
+        return queryset.annotate(bucket=trunc("day")).values("bucket").annotate(total=Sum("amount")).order_by("bucket")
+
+    def calculate_trends(self, user):
+        data = self.validated_data
+        start_date, end_date = get_start_end_time(data["frequency"], data.get("date"))
+        start_day, end_day = timezone.localdate(start_date), timezone.localdate(end_date)
+        bucket, group_by = data["bucket"], data.get("group_by")
+        rows = self.get_rows(user, start_day, end_day, bucket, group_by)
+        buckets = list(get_buckets(start_day, end_day, bucket))
+
+        if group_by:
+            # Every key with spending in the range gets a point per bucket, so charts don't skip the empty ones.
+            totals, labels = {}, {}
+            for row in rows:
+                totals[(row["bucket"], row["key"])] = row["total"] or Decimal("0.00")
+                labels.setdefault(row["key"], row["label"] or "Uncategorized")
+            keys = sorted(labels, key=lambda key: (key is not None, key or 0))
+            series = [{"bucket": current.isoformat(), "key": key, "label": labels[key], "total": str(totals.get((current, key), Decimal("0.00")).quantize(Decimal("0.01")))} for current in buckets for key in keys]
+        else:
+            totals = {row["bucket"]: row["total"] or Decimal("0.00") for row in rows}
+            series = [{"bucket": current.isoformat(), "total": str(totals.get(current, Decimal("0.00")).quantize(Decimal("0.01")))} for current in buckets]
+
+        return {"start": start_day.isoformat(), "end": end_day.isoformat(), "bucket": bucket, "group_by": group_by, "series": series}
+
+    def to_representation(self, instance):
+        user = self.context.get("user")
+        data = self.validated_data
+        start_date, end_date = get_start_end_time(data["frequency"], data.get("date"))
+        parts = [timezone.localdate(start_date), timezone.localdate(end_date), data["bucket"], data.get("group_by", "")]
+        return {"data": get_cached_dashboard(user.id, "trends", parts, lambda: self.calculate_trends(user))}
+
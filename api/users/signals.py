@@ -0,0 +1,16 @@
+from django.dispatch import receiver
+from django.db.models.signals import post_save
+from django.contrib.auth import get_user_model
+
+from api.users.search import sync_user_search_terms
+
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def update_user_search_terms(sender, instance, created, update_fields=None, **kwargs):
+    # Saves such as last_login updates don't touch the searchable fields.
+    if update_fields is not None and not {"fullname", "email"} & set(update_fields):
+        return
+    sync_user_search_terms([instance])
@@ -0,0 +1,20 @@
+import requests
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+
+from api.jobs.utils import job
+
+
+User = get_user_model()
+
+
+@job("users.download_profile_picture")
+def download_profile_picture(user_id, url):
+    user = User.objects.filter(id=user_id).first()
+    if user is None:
+        return
+
+    response = requests.get(url, timeout=10)
+    response.raise_for_status()
+    user.profile_picture.save(f"{user.fullname}_picture.jpg", ContentFile(response.content), save=True)
@@ -1,3 +1,218 @@
+import time
+from decimal import Decimal
+from datetime import date, datetime, timedelta
+
+from django.db import transaction
 from django.test import TestCase
+from django.core.cache import cache
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from api.core.testing import create_group, create_user, get_client, get_expense_payload, get_full_scans, requires_sqlite_plans, reset_query_caches
+from api.categories.models import Category
+from api.expenses.models import Expense, DailySpending
+from api.expenses.utils import rebuild_daily_spending, apply_spending_deltas
+from api.users.utils import get_cached_dashboard, get_dashboard_version_key, invalidate_dashboard_cache
+from api.users.models import UserSearchTerm
+from api.users.search import PrefixUserSearchBackend, sync_user_search_terms
+
+
+User = get_user_model()
+
+
+@requires_sqlite_plans
+class QueryPlanTests(TestCase):
+
+    def test_dashboard_rollup_reads_use_indexes(self):
+        user = create_user()
+        today = timezone.localdate()
+
+        for queryset in (DailySpending.objects.filter(user=user), DailySpending.objects.filter(user=user, day__gte=today - timedelta(days=30), day__lte=today)):
+            with self.subTest(query=str(queryset.query)[-80:]):
+                self.assertEqual(get_full_scans(queryset), [])
+
+
+class UserSearchTermTests(TestCase):
+
+    def get_terms(self, user):
+        return set(UserSearchTerm.objects.filter(user=user).values_list("term", flat=True))
+
+    def search(self, query):
+        return set(PrefixUserSearchBackend().search(User.objects.all(), query).values_list("fullname", flat=True))
+
+    def test_terms_follow_renames_and_deletes(self):
+        user = create_user(email="jose.nunez@example.com", fullname="José Núñez")
+        self.assertEqual(self.get_terms(user), {"jose", "nunez", "example", "com"})
+
+        user.fullname = "Joseph Smith"
+        user.save()
+        self.assertEqual(self.get_terms(user), {"joseph", "smith", "jose", "nunez", "example", "com"})
+
+        user.fullname = "Ana Smith"
+        user.save(update_fields=["fullname"])
+        self.assertNotIn("joseph", self.get_terms(user))
+
+        user.delete()
+        self.assertFalse(UserSearchTerm.objects.exists())
+
+    def test_prefix_lookup(self):
+        create_user(email="ana@example.com", fullname="Ana Smith")
+        create_user(email="anders@example.com", fullname="Anders Smithson")
+        create_user(email="jose@example.org", fullname="José Núñez")
+
+        self.assertEqual(self.search("an"), {"Ana Smith", "Anders Smithson"})
+        self.assertEqual(self.search("ana smi"), {"Ana Smith"})
+        self.assertEqual(self.search("smith an"), {"Ana Smith", "Anders Smithson"})
+        self.assertEqual(self.search("NÚÑ"), {"José Núñez"})
+        self.assertEqual(self.search("example.org"), {"José Núñez"})
+        self.assertEqual(self.search("zed"), set())
+        self.assertEqual(self.search("!!"), set())
+
+    @requires_sqlite_plans
+    def test_lookups_stay_on_the_term_index(self):
+        # Scaled down from the 1M-user target: the plan, not the row count, is what keeps lookups fast.
+        users = User.objects.bulk_create([User(email=f"user{i}@example.com", fullname=f"Member{i % 500} Surname{i}") for i in range(5000)])
+        sync_user_search_terms(users)
+
+        for query in ("member42", "member4 surname1", "surname4999"):
+            with self.subTest(query=query):
+                queryset = PrefixUserSearchBackend().search(User.objects.all(), query)
+                self.assertEqual(get_full_scans(queryset), [])
+
+                started = time.perf_counter()
+                list(queryset[:20])
+                self.assertLess(time.perf_counter() - started, 0.05)
+
+
+class DashboardTrendsTests(TestCase):
+
+    def setUp(self):
+        reset_query_caches()
+        self.group, self.members = create_group(2)
+        self.user = self.group.created_by
+        self.client = get_client(self.user)
+        self.category = Category.objects.create(name="Food")
+        # March 2026 starts on a Sunday, so week buckets begin on Monday 23 February.
+        self.add_expense(date(2026, 3, 2), "20.00", category=self.category.id)
+        self.add_expense(date(2026, 3, 2), "10.00")
+        self.add_expense(date(2026, 3, 17), "8.00", category=self.category.id)
+
+    def add_expense(self, day, amount, **extra):
+        expense_id = self.client.post("/api/expenses", get_expense_payload(self.group, self.members, amount=amount, **extra), format="json").json()["data"]["id"]
+        Expense.objects.filter(id=expense_id).update(created_at=timezone.make_aware(datetime.combine(day, datetime.min.time().replace(hour=12))))
+        rebuild_daily_spending([member.user_id for member in self.members])
+
+    def get_series(self, **params):
+        response = self.client.get("/api/dashboard/trends", {"frequency": "month", "date": "15-03-2026", **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()["data"]["series"]
+
+    def get_totals(self, series, key="total"):
+        return {row["bucket"]: row[key] for row in series}
+
+    def test_daily_buckets_cover_every_day(self):
+        series = self.get_series(bucket="day")
+
+        self.assertEqual(len(series), 31)
+        self.assertEqual(series[0], {"bucket": "2026-03-01", "total": "0.00"})
+        self.assertEqual(self.get_totals(series)["2026-03-02"], "15.00")
+        self.assertEqual(self.get_totals(series)["2026-03-17"], "4.00")
+
+    def test_weekly_and_monthly_buckets(self):
+        weekly = self.get_series(bucket="week")
+        self.assertEqual([row["bucket"] for row in weekly], ["2026-02-23", "2026-03-02", "2026-03-09", "2026-03-16", "2026-03-23", "2026-03-30"])
+        self.assertEqual([row["total"] for row in weekly], ["0.00", "15.00", "0.00", "4.00", "0.00", "0.00"])
+
+        self.assertEqual(self.get_series(bucket="month"), [{"bucket": "2026-03-01", "total": "19.00"}])
+
+    def test_grouped_series_are_zero_filled_per_key(self):
+        by_category = self.get_series(bucket="week", group_by="category")
+        self.assertEqual(len(by_category), 12)
+        self.assertEqual([(row["key"], row["label"]) for row in by_category[:2]], [(None, "Uncategorized"), (self.category.id, "Food")])
+        food = [row["total"] for row in by_category if row["key"] == self.category.id]
+        self.assertEqual(food, ["0.00", "10.00", "0.00", "4.00", "0.00", "0.00"])
+
+        by_group = self.get_series(bucket="day", group_by="group")
+        self.assertEqual(len(by_group), 31)
+        self.assertEqual({row["key"] for row in by_group}, {self.group.id})
+        self.assertEqual(sum(Decimal(row["total"]) for row in by_group), Decimal("19.00"))
+
+    def test_empty_periods(self):
+        self.assertEqual({row["total"] for row in self.get_series(date="15-01-2026", bucket="day")}, {"0.00"})
+        self.assertEqual(len(self.get_series(date="15-02-2026", bucket="day")), 28)
+        self.assertEqual(self.get_series(date="15-01-2026", bucket="week", group_by="category"), [])
+
+
+class DashboardCacheTests(TestCase):
+
+    def setUp(self):
+        reset_query_caches()
+        self.group, self.members = create_group(3)
+        self.client = get_client(self.group.created_by)
+        self.outsider = create_user(fullname="Outsider")
+        self.computed = []
+
+    def get_dashboard(self, user_id):
+        return get_cached_dashboard(user_id, "test", ["month"], lambda: self.computed.append(user_id) or len(self.computed))
+
+    def get_versions(self):
+        user_ids = [member.user_id for member in self.members] + [self.outsider.id]
+        return [cache.get(get_dashboard_version_key(user_id)) for user_id in user_ids]
+
+    def assert_invalidates(self, request, participants):
+        before = self.get_versions()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = request()
+        self.assertLess(response.status_code, 300)
+        after = self.get_versions()
+        self.assertEqual([old != new for old, new in zip(before, after)], participants + [False])
+
+    def test_expense_writes_invalidate_only_participants(self):
+        payload = get_expense_payload(self.group, self.members, amount="20.00")
+        payload["splits"][2]["is_included"] = False
+        expense_id = None
+
+        def create():
+            nonlocal expense_id
+            response = self.client.post("/api/expenses", payload, format="json")
+            expense_id = response.json()["data"]["id"]
+            return response
+
+        self.assert_invalidates(create, [True, True, False])
+        self.assert_invalidates(lambda: self.client.patch(f"/api/expenses/{expense_id}", {"amount": "30.00"}, format="json"), [True, True, False])
+        self.assert_invalidates(lambda: self.client.delete(f"/api/expenses/{expense_id}"), [True, True, False])
+
+    def test_cached_results_are_reused_until_invalidated(self):
+        user_id = self.members[0].user_id
+        self.assertEqual([self.get_dashboard(user_id), self.get_dashboard(user_id)], [1, 1])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_dashboard_cache([user_id])
+        self.assertEqual(self.get_dashboard(user_id), 2)
+
+    def test_invalidation_waits_for_commit(self):
+        user_id = self.members[0].user_id
+        self.get_dashboard(user_id)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    apply_spending_deltas({(user_id, timezone.localdate(), None): Decimal("5.00")})
+                    self.assertEqual(self.get_dashboard(user_id), 1)
+                    raise RuntimeError("rolled back")
+
+        self.assertEqual(callbacks, [])
+        self.assertIsNone(cache.get(get_dashboard_version_key(user_id)))
+        self.assertEqual(self.get_dashboard(user_id), 1)
+
+    def test_category_changes_invalidate_every_dashboard(self):
+        user_ids = [self.members[0].user_id, self.outsider.id]
+        self.assertEqual([self.get_dashboard(user_id) for user_id in user_ids], [1, 2])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            category = Category.objects.create(name="Travel")
+        self.assertEqual([self.get_dashboard(user_id) for user_id in user_ids], [3, 4])
 
-# Create your tests here.
+        with self.captureOnCommitCallbacks(execute=True):
+            category.delete()
+        self.assertEqual([self.get_dashboard(user_id) for user_id in user_ids], [5, 6])
@@ -1,6 +1,10 @@
-from datetime import datetime, time
+import uuid
+from datetime import datetime, time, timedelta
 
+from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
+from django.core.cache import cache
 
 
 def get_month_boundaries(self, date=None):
@@ -16,4 +20,62 @@ def get_month_boundaries(self, date=None):
     month_start = timezone.make_aware(datetime(target_year, target_month, 1, 0, 0, 0, 0))
     today_end = timezone.make_aware(datetime.combine(now.date(), time(23, 59, 59, 999999)))
     
-    return month_start, today_end
\ No newline at end of file
+    return month_start, today_end
+
+
+def get_bucket_start(day, bucket):
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def get_next_bucket(day, bucket):
+    if bucket == "week":
+        return day + timedelta(weeks=1)
+    if bucket == "month":
+        return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+    return day + timedelta(days=1)
+
+
+def get_buckets(start_day, end_day, bucket):
+    current = get_bucket_start(start_day, bucket)
+    while current <= end_day:
+        yield current
+        current = get_next_bucket(current, bucket)
+
+
+DASHBOARD_GLOBAL_VERSION_KEY = "dashboard:version"
+
+
+def get_dashboard_version_key(user_id):
+    return f"dashboard:version:{user_id}"
+
+
+def get_dashboard_cache_key(user_id, name, *parts):
+    # Entries embed the current global and per-user versions, so bumping a version orphans them on any cache backend.
+    versions = cache.get_many([DASHBOARD_GLOBAL_VERSION_KEY, get_dashboard_version_key(user_id)])
+    global_version = versions.get(DASHBOARD_GLOBAL_VERSION_KEY, 0)
+    user_version = versions.get(get_dashboard_version_key(user_id), 0)
+    return ":".join(str(part) for part in ("dashboard", name, user_id, global_version, user_version, *parts))
+
+
+def get_cached_dashboard(user_id, name, parts, compute):
+    cache_key = get_dashboard_cache_key(user_id, name, *parts)
+    result = cache.get(cache_key)
+    if result is None:
+        result = compute()
+        cache.set(cache_key, result, settings.DASHBOARD_CACHE_TIMEOUT)
+    return result
+
+
+def invalidate_dashboard_cache(user_ids):
+    user_ids = set(user_ids)
+    if user_ids:
+        transaction.on_commit(lambda: cache.set_many({get_dashboard_version_key(user_id): uuid.uuid4().hex for user_id in user_ids}, None))
+
+
+def invalidate_all_dashboard_caches():
+    transaction.on_commit(lambda: cache.set(DASHBOARD_GLOBAL_VERSION_KEY, uuid.uuid4().hex, None))
+
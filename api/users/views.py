@@ -3,7 +3,7 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from api.users.serializers import DashboardStatisticsSerializer, DashboardSpendingPatternSerializer
+from api.users.serializers import DashboardStatisticsSerializer, DashboardSpendingPatternSerializer, DashboardTrendsSerializer
 
 
 class DashboardStatisticsView(APIView):
@@ -26,3 +26,15 @@ class DashboardSpendingPatternView(APIView):
         serializer.is_valid(raise_exception=True)
         spending_pattern = serializer.to_representation(None)
         return Response(spending_pattern, status=status.HTTP_200_OK)
+
+
+class DashboardTrendsView(APIView):
+    serializer_class = DashboardTrendsSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        serializer = self.serializer_class(data=request.query_params, context={'user': request.user})
+        serializer.is_valid(raise_exception=True)
+        trends = serializer.to_representation(None)
+        return Response(trends, status=status.HTTP_200_OK)
+
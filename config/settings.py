@@ -75,7 +75,9 @@ THIRD_PARTY_APPS = [
     "api.groups",
     "api.categories",
     "api.expenses",
-    "api.activities"
+    "api.activities",
+    "api.jobs",
+    "api.search",
 ]
 
 INSTALLED_APPS = DEFAULT_APPS + THIRD_PARTY_APPS
@@ -123,6 +125,19 @@ DATABASES = {
 }
 
 
+# Local memory by default; point CACHE_BACKEND at a file, database or shared cache backend when running several workers.
+# Cache invalidation (categories, dashboards) only reaches the cache of the process that made the change, so with
+# local memory other workers keep serving their copy until CATEGORY_CACHE_TIMEOUT / DASHBOARD_CACHE_TIMEOUT expires.
+# The database backend needs `python manage.py createcachetable`.
+
+CACHES = {
+    'default': {
+        'BACKEND': env.str("CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"),
+        'LOCATION': env.str("CACHE_LOCATION", default="splitpeer"),
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -192,6 +207,22 @@ AUTH_USER_MODEL = "users.User"
 
 MAX_IMAGE_SIZE = env.int("MAX_IMAGE_SIZE", 5)
 
+NOTIFICATION_TRANSPORT = env.str("NOTIFICATION_TRANSPORT", default="api.activities.transports.FCMTransport")
+
+JOBS_MAX_ATTEMPTS = env.int("JOBS_MAX_ATTEMPTS", default=5)
+JOBS_RETRY_DELAY = env.int("JOBS_RETRY_DELAY", default=30)
+JOBS_LOCK_TIMEOUT = env.int("JOBS_LOCK_TIMEOUT", default=600)
+
+EXPENSE_UPDATE_COALESCE_WINDOW = env.int("EXPENSE_UPDATE_COALESCE_WINDOW", default=60)
+
+ACTIVITY_RETENTION_DAYS = env.int("ACTIVITY_RETENTION_DAYS", default=90)
+
+DASHBOARD_CACHE_TIMEOUT = env.int("DASHBOARD_CACHE_TIMEOUT", default=900)
+
+CATEGORY_CACHE_TIMEOUT = env.int("CATEGORY_CACHE_TIMEOUT", default=300)
+
+USER_SEARCH_BACKEND = env.str("USER_SEARCH_BACKEND", default="api.users.search.PrefixUserSearchBackend")
+
 ACCOUNT_LOGIN_METHODS = {"email"}
 ACCOUNT_UNIQUE_EMAIL = True
 ACCOUNT_EMAIL_REQUIRED = True